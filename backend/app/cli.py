@@ -0,0 +1,92 @@
+"""
+Maintenance commands for the Job Organizer backend.
+
+Run from the backend directory:
+
+    python -m app.cli rebuild-stats
+    python -m app.cli seed --jobs 1000000
+    python -m app.cli ingest jobs.csv
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from .db.database import async_session, init_db
+from .services import job_ingest, job_service, synthetic_jobs
+
+
+async def rebuild_stats(args):
+    async with async_session() as db:
+        stats = await job_service.rebuild_job_stats(db)
+    print(json.dumps(stats, indent=2))
+
+
+async def seed(args):
+    def progress(seeded, count):
+        print(f"Seeded {seeded:,}/{count:,} jobs", end="\r", flush=True)
+
+    started = time.perf_counter()
+    totals = await synthetic_jobs.seed_jobs(
+        args.jobs, chunk_size=args.chunk_size, tombstone_rate=args.tombstone_rate,
+        seed=args.seed, workers=args.workers, progress=progress
+    )
+    print()
+    print(json.dumps(dict(totals, seconds=round(time.perf_counter() - started, 1)), indent=2))
+
+
+async def _file_chunks(file, size: int = 1 << 20):
+    while chunk := await asyncio.to_thread(file.read, size):
+        yield chunk
+
+
+async def ingest(args):
+    fmt = args.format or job_ingest.format_for(filename=args.file)
+    started = time.perf_counter()
+    with (sys.stdin.buffer if args.file == "-" else open(args.file, "rb")) as file:
+        async with async_session() as db:
+            result = await job_ingest.ingest_jobs(db, _file_chunks(file), fmt, batch_size=args.batch_size)
+    print(json.dumps(dict(result, seconds=round(time.perf_counter() - started, 1)), indent=2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser(
+        "rebuild-stats",
+        help="Recount the job_stats counters from the jobs table"
+    ).set_defaults(handler=rebuild_stats)
+
+    seed_parser = commands.add_parser(
+        "seed",
+        help="Add synthetic jobs, responses and tombstones, loaded with COPY"
+    )
+    seed_parser.add_argument("--jobs", type=int, default=10_000, help="Number of jobs, tombstones included")
+    seed_parser.add_argument("--chunk-size", type=int, default=synthetic_jobs.SEED_CHUNK_SIZE, help="Jobs generated and committed at a time")
+    seed_parser.add_argument("--tombstone-rate", type=float, default=0.03, help="Fraction of jobs created as deleted")
+    seed_parser.add_argument("--workers", type=int, default=synthetic_jobs.SEED_WORKERS, help="Concurrent COPY connections")
+    seed_parser.add_argument("--seed", type=int, help="Random seed, for a reproducible dataset")
+    seed_parser.set_defaults(handler=seed)
+
+    ingest_parser = commands.add_parser(
+        "ingest",
+        help="Load jobs from a CSV or NDJSON file through COPY, skipping duplicates and tombstones"
+    )
+    ingest_parser.add_argument("file", help="CSV or NDJSON file, or - for stdin")
+    ingest_parser.add_argument("--format", choices=("csv", "ndjson"), help="Defaults from the file extension (.csv, otherwise NDJSON)")
+    ingest_parser.add_argument("--batch-size", type=int, default=job_ingest.INGEST_BATCH_SIZE, help="Records validated and staged at a time")
+    ingest_parser.set_defaults(handler=ingest)
+
+    args = parser.parse_args(argv)
+
+    async def run():
+        await init_db()
+        await args.handler(args)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+HTTP conditional GET support.
+
+Endpoints compute a cheap version of the data they serve (a few index
+lookups), turn it into ETag/Last-Modified validators and answer a matching
+If-None-Match or If-Modified-Since with a bodiless 304 before any rows are
+loaded or serialized.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC (datetime.utcnow)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    """The newest of ``timestamps``, ignoring missing ones."""
+    present = [value for value in timestamps if value is not None]
+    return max(present) if present else None
+
+
+def validators(*version, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """Response headers for a representation identified by ``version``."""
+    digest = hashlib.sha1(repr(version).encode()).hexdigest()[:20]
+    # Weak: the same data may be sent with different content encodings.
+    # no-cache lets clients keep the body but revalidate before each reuse.
+    headers = {"ETag": f'W/"{digest}"', "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        second = _as_utc(last_modified).replace(microsecond=0)
+        # HTTP dates have whole seconds, so a later write within the same
+        # second would match If-Modified-Since; the date is only given once
+        # its second is over, until then the ETag alone validates
+        if second < datetime.now(timezone.utc).replace(microsecond=0):
+            headers["Last-Modified"] = format_datetime(second, usegmt=True)
+    return headers
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """Whether the request's preconditions say the client copy is current.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    when the client sent no entity tags.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, headers["ETag"])
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and "Last-Modified" in headers:
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        return parsedate_to_datetime(headers["Last-Modified"]) <= since
+    return False
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
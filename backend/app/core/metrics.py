@@ -0,0 +1,243 @@
+"""
+Operational metrics in the Prometheus text format.
+
+A handful of counters, gauges and histograms, kept in process memory and
+rendered by GET /metrics. MetricsMiddleware times every request under its
+route template (``/api/jobs/{job_id}``, not the raw path) and opens a
+per-request scope that the SQLAlchemy engine hooks in db/database.py add
+query counts and time to, so DB time can be read per route.
+
+Each worker process keeps its own values; scrape them all or run one
+worker per instance.
+"""
+import math
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+# Starlette appends the charset to text/ media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def header(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """A value set directly, or read from ``callback`` at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback: Optional[Callable[[], Dict[tuple, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self.callback = callback
+
+    def inc(self, *labels, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def samples(self):
+        values = self.callback() if self.callback is not None else self._values
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> [count per bucket..., sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels):
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * len(self.buckets) + [0.0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[index] += 1
+                break
+        state[-1] += value
+
+    def samples(self):
+        names = self.labelnames + ("le",)
+        for labels, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(state[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.header())
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being served", ("method", "route")
+)
+DB_QUERIES = Counter(
+    "http_db_queries_total", "Database queries issued while serving each route", ("method", "route")
+)
+DB_TIME = Counter(
+    "http_db_query_seconds_total", "Database query time spent serving each route", ("method", "route")
+)
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Database query latency by engine", ("engine",)
+)
+STATS_CACHE = Counter(
+    "stats_breakdown_cache_requests_total", "Stats breakdown lookups served from cache (hit) or computed (miss)", ("result",)
+)
+
+
+def _stats_cache_hit_ratio():
+    hits, misses = STATS_CACHE.value("hit"), STATS_CACHE.value("miss")
+    return {(): hits / (hits + misses)} if hits + misses else {}
+
+
+Gauge("stats_breakdown_cache_hit_ratio", "Share of stats breakdown lookups served from cache", callback=_stats_cache_hit_ratio)
+
+
+# Connection pools by engine name, read at scrape time
+_pools = {}
+
+
+def register_pool(name: str, pool):
+    """Export the connection gauges of ``pool`` under engine=``name``"""
+    _pools[name] = pool
+
+
+def _pool_gauge(metric: str, documentation: str, read: Callable):
+    Gauge(metric, documentation, ("engine",), callback=lambda: {(name,): read(pool) for name, pool in _pools.items()})
+
+
+_pool_gauge("db_pool_checked_out", "Connections in use", lambda pool: pool.checkedout())
+_pool_gauge("db_pool_checked_in", "Idle connections in the pool", lambda pool: pool.checkedin())
+_pool_gauge("db_pool_overflow", "Connections beyond pool_size (negative while the pool is filling)", lambda pool: pool.overflow())
+_pool_gauge("db_pool_size", "Configured pool_size", lambda pool: pool.size())
+
+
+class _RequestScope:
+    __slots__ = ("method", "route", "queries", "db_seconds")
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_request_scope: ContextVar[Optional[_RequestScope]] = ContextVar("metrics_request_scope", default=None)
+
+
+def observe_query(engine: str, seconds: float):
+    """Record one database query, and charge it to the current request"""
+    QUERY_DURATION.observe(seconds, engine)
+    scope = _request_scope.get()
+    if scope is not None:
+        scope.queries += 1
+        scope.db_seconds += seconds
+
+
+def _route_template(app, scope) -> str:
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    # Unmatched paths share one label, so scanners cannot blow up the series
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, router_app=None):
+        self.app = app
+        # The FastAPI app whose routes name the requests
+        self.router_app = router_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_template(self.router_app, scope)
+        request_scope = _RequestScope(method, route)
+        token = _request_scope.set(request_scope)
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_DURATION.observe(time.perf_counter() - started, method, route, status)
+            REQUESTS_IN_PROGRESS.dec(method, route)
+            DB_QUERIES.inc(method, route, amount=request_scope.queries)
+            DB_TIME.inc(method, route, amount=request_scope.db_seconds)
+            _request_scope.reset(token)
@@ -0,0 +1,190 @@
+"""
+Content negotiation for API responses.
+
+ContentNegotiationMiddleware reads the request's Accept and Accept-Encoding
+headers. It records the preferred body format for NegotiatedResponse and
+compresses response bodies above a size threshold with brotli or gzip,
+chunk by chunk, so streamed responses are never buffered whole.
+
+NegotiatedResponse, the app's default response class, renders MessagePack
+when the client asks for it and JSON otherwise, through orjson when that is
+installed. msgpack, orjson and brotli are all optional: without them the
+corresponding format is simply not offered.
+"""
+import zlib
+from contextvars import ContextVar
+from typing import Dict, Sequence
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+# In server preference order; the first one wins a tie, so */* gets JSON
+MEDIA_TYPES = (JSON, MSGPACK) if msgpack is not None else (JSON,)
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+_response_media_type: ContextVar[str] = ContextVar("response_media_type", default=JSON)
+
+
+def _parse_qlist(header: str) -> Dict[str, float]:
+    """``{token: q}`` for an Accept-style header"""
+    qualities = {}
+    for item in header.split(","):
+        token, *params = [part.strip() for part in item.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[token.lower()] = q
+    return qualities
+
+
+def choose_media_type(accept: str, offered: Sequence[str] = MEDIA_TYPES) -> str:
+    qualities = _parse_qlist(accept or "*/*")
+    # application/x-msgpack is the older, still common name
+    if "application/x-msgpack" in qualities:
+        qualities.setdefault(MSGPACK, qualities["application/x-msgpack"])
+
+    def quality(media_type):
+        # The most specific matching range decides
+        major = media_type.split("/")[0]
+        for media_range in (media_type, f"{major}/*", "*/*"):
+            if media_range in qualities:
+                return qualities[media_range]
+        return 0.0
+
+    best = max(offered, key=lambda media_type: (quality(media_type), -offered.index(media_type)))
+    return best if quality(best) > 0 else offered[0]
+
+
+def choose_encoding(accept_encoding: str, offered: Sequence[str] = ENCODINGS):
+    qualities = _parse_qlist(accept_encoding or "")
+    scored = [(qualities.get(coding, qualities.get("*", 0.0)), -index, coding) for index, coding in enumerate(offered)]
+    q, _, coding = max(scored)
+    return coding if q > 0 else None
+
+
+class NegotiatedResponse(JSONResponse):
+    """JSON or MessagePack body, as negotiated by ContentNegotiationMiddleware"""
+
+    def render(self, content) -> bytes:
+        if _response_media_type.get() == MSGPACK:
+            self.media_type = MSGPACK
+            return msgpack.packb(content, use_bin_type=True)
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(content)
+
+
+def _compressor(encoding: str, level: int):
+    """``(compress, finish)`` callables for one response body.
+
+    Every chunk is flushed as it is compressed, so a streamed body reaches the
+    client as it is produced instead of when the compressor's window fills.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=min(level, 11))
+        return (lambda data: compressor.process(data) + compressor.flush()), compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return (lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+class ContentNegotiationMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, compresslevel: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        token = _response_media_type.set(choose_media_type(headers.get("accept", "")))
+        try:
+            responder = _CompressingResponder(
+                send, choose_encoding(headers.get("accept-encoding", "")),
+                self.minimum_size, self.compresslevel
+            )
+            await self.app(scope, receive, responder)
+        finally:
+            _response_media_type.reset(token)
+
+
+class _CompressingResponder:
+    def __init__(self, send, encoding, minimum_size: int, compresslevel: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.start_message = None
+        self.compress = None
+        self.finish = None
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether to compress
+            self.start_message = message
+            headers = MutableHeaders(scope=message)
+            headers.add_vary_header("Accept")
+            headers.add_vary_header("Accept-Encoding")
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(scope=start)
+            if (
+                self.encoding is None
+                or "content-encoding" in headers
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compress, self.finish = _compressor(self.encoding, self.compresslevel)
+            headers["Content-Encoding"] = self.encoding
+            del headers["Content-Length"]
+            body = self.compress(body)
+            if not more_body:
+                body += self.finish()
+                headers["Content-Length"] = str(len(body))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        if self.compress is None:
+            await self.send(message)
+            return
+        body = self.compress(body)
+        if not more_body:
+            body += self.finish()
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
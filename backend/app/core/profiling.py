@@ -0,0 +1,143 @@
+"""
+Opt-in sampling profiler for single requests.
+
+With PROFILING_ENABLED, ProfilingMiddleware profiles the requests that ask
+for it (``X-Profile`` header or ``profile`` query parameter, carrying
+PROFILING_TOKEN when one is set) with pyinstrument, a statistical profiler
+that follows the request across awaits. Each profile is stored in
+PROFILING_DIR as a flame graph (speedscope JSON, open it on
+https://www.speedscope.app) and an HTML call tree, next to a small metadata
+file. Only the newest PROFILING_MAX_PROFILES are kept. The response names
+its profile in the ``X-Profile-Id`` header; GET /api/profiles lists them.
+
+When profiling is disabled the middleware is not installed at all, so
+requests pay nothing for it. pyinstrument is optional: without it the mode
+cannot be enabled.
+"""
+import asyncio
+import json
+import logging
+import re
+import secrets
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+except ImportError:
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+# Downloadable renderings by format name: file suffix and media type
+FORMATS = {
+    "speedscope": (".speedscope.json", "application/json"),
+    "html": (".html", "text/html"),
+}
+_META_SUFFIX = ".meta.json"
+_PROFILE_ID = re.compile(r"^\d{13}-[0-9a-f]{6}$")
+
+
+def _new_profile_id() -> str:
+    # Millisecond timestamp first, so ids sort by age
+    return f"{int(time.time() * 1000):013d}-{secrets.token_hex(3)}"
+
+
+def is_profile_id(profile_id: str) -> bool:
+    return bool(_PROFILE_ID.match(profile_id))
+
+
+def list_profiles(directory: str) -> List[dict]:
+    """Metadata of the stored profiles, newest first"""
+    profiles = []
+    for meta_file in sorted(Path(directory).glob(f"*{_META_SUFFIX}"), reverse=True):
+        try:
+            profiles.append(json.loads(meta_file.read_text()))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_file(directory: str, profile_id: str, fmt: str) -> Optional[Path]:
+    """Path of a stored rendering, or None for unknown ids and formats"""
+    if not is_profile_id(profile_id) or fmt not in FORMATS:
+        return None
+    path = Path(directory) / f"{profile_id}{FORMATS[fmt][0]}"
+    return path if path.is_file() else None
+
+
+def _store(directory: Path, max_profiles: int, profile_id: str, profiler, meta: dict):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{profile_id}{FORMATS['speedscope'][0]}").write_text(profiler.output(SpeedscopeRenderer()))
+    (directory / f"{profile_id}{FORMATS['html'][0]}").write_text(profiler.output(HTMLRenderer()))
+    (directory / f"{profile_id}{_META_SUFFIX}").write_text(json.dumps(meta))
+    # The ring: drop the oldest profiles beyond max_profiles
+    stored = sorted(path.name[:-len(_META_SUFFIX)] for path in directory.glob(f"*{_META_SUFFIX}"))
+    for old_id in stored[:-max_profiles]:
+        for path in directory.glob(f"{old_id}.*"):
+            path.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self, app, directory: str, max_profiles: int = 50, interval: float = 0.001,
+        token: Optional[str] = None, exclude_prefix: str = "/api/profiles"
+    ):
+        if Profiler is None:
+            raise RuntimeError("PROFILING_ENABLED requires pyinstrument (pip install pyinstrument)")
+        self.app = app
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+        self.interval = interval
+        self.token = token
+        # Reading profiles must not rotate them out of the ring
+        self.exclude_prefix = exclude_prefix
+
+    def _requested(self, scope) -> bool:
+        if scope["path"].startswith(self.exclude_prefix):
+            return False
+        flag = Headers(scope=scope).get("x-profile") or QueryParams(scope["query_string"]).get("profile")
+        if not flag:
+            return False
+        return flag == self.token if self.token else flag.lower() not in ("0", "false")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = _new_profile_id()
+        status = None
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.stop()
+            meta = {
+                "id": profile_id,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(int(profile_id[:13]) / 1000)),
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope["query_string"].decode("latin-1"),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+            try:
+                # Rendering and writing happen off the event loop
+                await asyncio.to_thread(_store, self.directory, self.max_profiles, profile_id, profiler, meta)
+            except OSError as exc:
+                logger.warning(f"Could not store profile {profile_id}: {exc}")
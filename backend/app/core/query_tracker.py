@@ -0,0 +1,147 @@
+"""
+SQL statement tracking for development and tests.
+
+The engine hooks in db/database.py report every statement to the query
+logs open in the current context. A log counts statements and DB time, and
+groups statements by shape (the SQL with parameters and literals blanked
+out), so the same shape issued many times - the signature of an N+1 loop -
+stands out.
+
+With QUERY_TRACKING on (the default when DEBUG is), QueryTrackingMiddleware
+opens a log per request. Each response then carries a ``Server-Timing: db``
+header with the statement count and DB time. Repeated shapes are logged as
+probable N+1 queries.
+
+Tests and scripts can put a budget on any block, request or service call:
+
+    with query_budget(2):
+        await client.get("/api/jobs")
+
+    with track_queries() as log:
+        await job_service.update_job(db, job_id, changes)
+    print(log.count, log.seconds, log.repeated())
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# A shape issued this many times in one log is reported as a probable N+1
+REPEAT_THRESHOLD = 3
+
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_LITERALS = re.compile(r"\$\d+|%\(\w+\)s|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_CAST = re.compile(r"\?::\w+(?:\[\])?")
+
+
+def statement_shape(statement: str) -> str:
+    """``statement`` with parameters and literals replaced by ``?``"""
+    shape = _LITERALS.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    shape = _PLACEHOLDER_CAST.sub("?", shape)
+    # IN lists and VALUES rows differ in length only
+    return _PLACEHOLDER_LIST.sub("(?, ...)", shape)
+
+
+class QueryLog:
+    """Statements recorded while the log was open"""
+
+    def __init__(self):
+        self.statements: List[Tuple[str, float]] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def seconds(self) -> float:
+        return sum(seconds for _, seconds in self.statements)
+
+    def shapes(self) -> Counter:
+        return Counter(statement_shape(statement) for statement, _ in self.statements)
+
+    def repeated(self, threshold: int = REPEAT_THRESHOLD) -> Dict[str, int]:
+        """Shapes issued at least ``threshold`` times: probable N+1 queries"""
+        return {shape: count for shape, count in self.shapes().items() if count >= threshold}
+
+    def summary(self) -> str:
+        lines = [f"{self.count} statements in {self.seconds * 1000:.1f} ms"]
+        lines.extend(f"  {count}x {shape}" for shape, count in self.shapes().most_common())
+        return "\n".join(lines)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+_open_logs: ContextVar[Tuple[QueryLog, ...]] = ContextVar("open_query_logs", default=())
+
+
+def record(statement: str, seconds: float):
+    """Add a statement to every log open in this context"""
+    for log in _open_logs.get():
+        log.statements.append((statement, seconds))
+
+
+@contextmanager
+def track_queries():
+    """Record the statements executed inside the block; logs may nest"""
+    log = QueryLog()
+    token = _open_logs.set(_open_logs.get() + (log,))
+    try:
+        yield log
+    finally:
+        _open_logs.reset(token)
+
+
+@contextmanager
+def query_budget(max_statements: int, max_seconds: Optional[float] = None, allow_repeats: bool = False):
+    """Raise QueryBudgetExceeded if the block executes more than
+    ``max_statements`` statements, spends more than ``max_seconds`` in the
+    database or, unless ``allow_repeats``, repeats a statement shape
+    REPEAT_THRESHOLD times."""
+    with track_queries() as log:
+        yield log
+    problems = []
+    if log.count > max_statements:
+        problems.append(f"{log.count} statements, budget {max_statements}")
+    if max_seconds is not None and log.seconds > max_seconds:
+        problems.append(f"{log.seconds:.3f}s in the database, budget {max_seconds}s")
+    if not allow_repeats and log.repeated():
+        problems.append("probable N+1 (repeated statement shapes)")
+    if problems:
+        raise QueryBudgetExceeded("; ".join(problems) + "\n" + log.summary())
+
+
+class QueryTrackingMiddleware:
+    def __init__(self, app, repeat_threshold: int = REPEAT_THRESHOLD):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as log:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    # Statements a streamed body runs later are not included
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", f'db;dur={log.seconds * 1000:.1f};desc="{log.count} queries"')
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+        repeated = log.repeated(self.repeat_threshold)
+        if repeated:
+            logger.warning(
+                f"Probable N+1 in {scope['method']} {scope['path']}: "
+                + "; ".join(f"{count}x {shape}" for shape, count in repeated.items())
+            )
@@ -1,26 +1,323 @@
+import itertools
+import time
+
+from fastapi import Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import MetaData
-from ..core.config import DATABASE_URL
+from sqlalchemy import MetaData, event, text
+from ..core import metrics, query_tracker
+from ..core.config import (
+    DATABASE_URL, DATABASE_REPLICA_URLS, DB_ECHO, DB_MAX_OVERFLOW, DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_STATEMENT_CACHE_SIZE,
+    READ_YOUR_WRITES_SECONDS
+)
+
+def create_engine_for(url: str):
+    """Async engine with the pool settings from core.config"""
+    # SQLAlchemy's asyncpg dialect keeps its own prepared statement cache
+    # next to asyncpg's; both follow DB_STATEMENT_CACHE_SIZE
+    url = make_url(url).update_query_dict({"prepared_statement_cache_size": str(DB_STATEMENT_CACHE_SIZE)})
+    return create_async_engine(
+        url,
+        echo=DB_ECHO,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={"statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+    )
+
+def instrument_engine(engine, name: str):
+    """Report ``engine``'s query timings and pool usage to core.metrics, and
+    its statements to the open core.query_tracker logs"""
+    metrics.register_pool(name, engine.pool)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        context.metrics_started = time.perf_counter()
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context.metrics_started
+        metrics.observe_query(name, seconds)
+        query_tracker.record(statement, seconds)
+
+engine = create_engine_for(DATABASE_URL)
+instrument_engine(engine, "primary")
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Read-only sessions rotate over the replicas; without replicas they are
+# ordinary primary sessions
+replica_engines = [create_engine_for(url) for url in DATABASE_REPLICA_URLS]
+for number, replica in enumerate(replica_engines, 1):
+    instrument_engine(replica, f"replica{number}")
+_read_sessions = itertools.cycle([
+    sessionmaker(replica, class_=AsyncSession, expire_on_commit=False)
+    for replica in replica_engines
+] or [async_session])
+
+# Cookie holding the time until which a client that wrote reads from the primary
+PRIMARY_PIN_COOKIE = "db_primary_until"
+
 Base = declarative_base()
 
-async def get_db():
+# Idempotent schema upgrades, applied in order on every startup after
+# create_all has built any missing tables
+SCHEMA_UPGRADES = [
+    # Add date_modified column if missing (for schema migration)
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS date_modified TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP",
+    # Superseded by the (sort key, id) keyset pagination indexes
+    "DROP INDEX IF EXISTS ix_jobs_priority",
+    "DROP INDEX IF EXISTS ix_jobs_date_added",
+    # Tombstones record the deleted job's id for GET /api/jobs/changes
+    "ALTER TABLE deleted_jobs ADD COLUMN IF NOT EXISTS job_id INTEGER",
+    # Change feed positions: the id of the transaction that last wrote each
+    # job or tombstone. Unlike a clock stamp it orders writes by transaction,
+    # which the watermarks of GET /api/jobs/changes rely on
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT 0",
+    "ALTER TABLE deleted_jobs ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT 0",
+    """
+    CREATE OR REPLACE FUNCTION stamp_change_xid() RETURNS trigger AS $$
+    BEGIN
+        NEW.change_xid := pg_current_xact_id()::text::bigint;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS jobs_change_xid_trigger ON jobs",
+    """
+    CREATE TRIGGER jobs_change_xid_trigger BEFORE INSERT OR UPDATE ON jobs
+    FOR EACH ROW EXECUTE FUNCTION stamp_change_xid()
+    """,
+    "DROP TRIGGER IF EXISTS deleted_jobs_change_xid_trigger ON deleted_jobs",
+    """
+    CREATE TRIGGER deleted_jobs_change_xid_trigger BEFORE INSERT ON deleted_jobs
+    FOR EACH ROW EXECUTE FUNCTION stamp_change_xid()
+    """,
+    # Full-text search: weighted document over the searchable job fields
+    """
+    CREATE OR REPLACE FUNCTION jobs_search_document(
+        title text, company text, location text, description text, technologies text[]
+    ) RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('english', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(company, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(array_to_string(technologies, ' '), '')), 'B')
+            || setweight(to_tsvector('english', coalesce(location, '')), 'C')
+            || setweight(to_tsvector('english', coalesce(description, '')), 'D')
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+    """
+    DO $$ BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'jobs' AND column_name = 'search_vector'
+        ) THEN
+            ALTER TABLE jobs ADD COLUMN search_vector tsvector;
+            UPDATE jobs SET search_vector = jobs_search_document(title, company, location, description, technologies);
+        END IF;
+    END $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION jobs_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := jobs_search_document(NEW.title, NEW.company, NEW.location, NEW.description, NEW.technologies);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS jobs_search_vector_trigger ON jobs",
+    """
+    CREATE TRIGGER jobs_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, company, location, description, technologies ON jobs
+    FOR EACH ROW EXECUTE FUNCTION jobs_search_vector_update()
+    """,
+    # Incremental job counters: statement-level triggers fold each write's
+    # transition rows into per-dimension deltas on job_stats
+    """
+    CREATE OR REPLACE FUNCTION job_stats_add(statuses text[], priorities text[], deltas int[])
+    RETURNS void AS $$
+        INSERT INTO job_stats AS s (dimension, value, count)
+        SELECT d.dimension, d.value, sum(c.delta)
+        FROM unnest(statuses, priorities, deltas) AS c(status, priority, delta)
+        CROSS JOIN LATERAL (VALUES
+            ('total', ''), ('status', coalesce(c.status, '')), ('priority', coalesce(c.priority, ''))
+        ) AS d(dimension, value)
+        GROUP BY d.dimension, d.value
+        HAVING sum(c.delta) <> 0
+        -- Every writer locks the counter rows in the same order, so two
+        -- concurrent writes cannot deadlock on them
+        ORDER BY d.dimension, d.value
+        ON CONFLICT (dimension, value) DO UPDATE SET count = s.count + EXCLUDED.count
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION job_stats_update() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM job_stats_add(array_agg(status::text), array_agg(priority::text), array_agg(1)) FROM new_rows;
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM job_stats_add(array_agg(status::text), array_agg(priority::text), array_agg(-1)) FROM old_rows;
+        ELSE
+            PERFORM job_stats_add(array_agg(status), array_agg(priority), array_agg(delta)) FROM (
+                SELECT status::text, priority::text, -1 AS delta FROM old_rows
+                UNION ALL
+                SELECT status::text, priority::text, 1 FROM new_rows
+            ) AS changes;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION job_stats_rebuild() RETURNS void AS $$
+        LOCK TABLE jobs IN SHARE MODE;
+        DELETE FROM job_stats;
+        INSERT INTO job_stats (dimension, value, count)
+        SELECT
+            CASE WHEN GROUPING(status) = 0 THEN 'status' WHEN GROUPING(priority) = 0 THEN 'priority' ELSE 'total' END,
+            coalesce(status::text, priority::text, ''),
+            count(*)
+        FROM jobs
+        GROUP BY GROUPING SETS ((), (status), (priority));
+    $$ LANGUAGE sql
+    """,
+    "DROP TRIGGER IF EXISTS job_stats_insert_trigger ON jobs",
+    "DROP TRIGGER IF EXISTS job_stats_update_trigger ON jobs",
+    "DROP TRIGGER IF EXISTS job_stats_delete_trigger ON jobs",
+    """
+    CREATE TRIGGER job_stats_insert_trigger AFTER INSERT ON jobs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_stats_update()
+    """,
+    """
+    CREATE TRIGGER job_stats_update_trigger AFTER UPDATE ON jobs
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_stats_update()
+    """,
+    """
+    CREATE TRIGGER job_stats_delete_trigger AFTER DELETE ON jobs
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_stats_update()
+    """,
+    # Live change feed: every write to jobs sends one NOTIFY on job_changes
+    # carrying the operation, the ids (up to 500, else null: resync) and the
+    # total/status/priority count deltas
+    """
+    CREATE OR REPLACE FUNCTION jobs_change_payload(op text, ids int[], statuses text[], priorities text[], deltas int[])
+    RETURNS text AS $$
+        SELECT json_build_object(
+            'op', lower(op),
+            'ids', CASE WHEN cardinality(ids) <= 500 THEN (SELECT array_agg(DISTINCT i ORDER BY i) FROM unnest(ids) AS i) END,
+            'total', (SELECT sum(d) FROM unnest(deltas) AS d),
+            'status', (
+                SELECT coalesce(json_object_agg(s, n), '{}') FROM (
+                    SELECT s, sum(d) AS n FROM unnest(statuses, deltas) AS c(s, d)
+                    WHERE s IS NOT NULL GROUP BY s HAVING sum(d) <> 0
+                ) AS x
+            ),
+            'priority', (
+                SELECT coalesce(json_object_agg(p, n), '{}') FROM (
+                    SELECT p, sum(d) AS n FROM unnest(priorities, deltas) AS c(p, d)
+                    WHERE p IS NOT NULL GROUP BY p HAVING sum(d) <> 0
+                ) AS x
+            )
+        )::text
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION jobs_notify_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM pg_notify('job_changes', jobs_change_payload(TG_OP, array_agg(id), array_agg(status::text), array_agg(priority::text), array_agg(1)))
+            FROM new_rows HAVING count(*) > 0;
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM pg_notify('job_changes', jobs_change_payload(TG_OP, array_agg(id), array_agg(status::text), array_agg(priority::text), array_agg(-1)))
+            FROM old_rows HAVING count(*) > 0;
+        ELSE
+            PERFORM pg_notify('job_changes', jobs_change_payload(TG_OP, array_agg(id), array_agg(status), array_agg(priority), array_agg(delta)))
+            FROM (
+                SELECT id, status::text, priority::text, -1 AS delta FROM old_rows
+                UNION ALL
+                SELECT id, status::text, priority::text, 1 FROM new_rows
+            ) AS changes HAVING count(*) > 0;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS jobs_notify_insert_trigger ON jobs",
+    "DROP TRIGGER IF EXISTS jobs_notify_update_trigger ON jobs",
+    "DROP TRIGGER IF EXISTS jobs_notify_delete_trigger ON jobs",
+    """
+    CREATE TRIGGER jobs_notify_insert_trigger AFTER INSERT ON jobs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION jobs_notify_change()
+    """,
+    """
+    CREATE TRIGGER jobs_notify_update_trigger AFTER UPDATE ON jobs
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION jobs_notify_change()
+    """,
+    """
+    CREATE TRIGGER jobs_notify_delete_trigger AFTER DELETE ON jobs
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION jobs_notify_change()
+    """,
+    # Seed the counters the first time they exist
+    "SELECT job_stats_rebuild() WHERE NOT EXISTS (SELECT 1 FROM job_stats WHERE dimension = 'total')",
+]
+
+async def get_db(response: Response):
+    """Session on the primary, for routes that write"""
     async with async_session() as session:
+        if replica_engines:
+            @event.listens_for(session.sync_session, "after_commit")
+            def pin_to_primary(_):
+                # Keep this client's reads on the primary until the replicas
+                # have (almost certainly) replayed the commit
+                until = time.time() + READ_YOUR_WRITES_SECONDS
+                response.set_cookie(
+                    PRIMARY_PIN_COOKIE, f"{until:.3f}",
+                    max_age=int(READ_YOUR_WRITES_SECONDS) + 1, httponly=True, samesite="lax"
+                )
         try:
             yield session
         finally:
             await session.close()
 
+def _pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def read_session_factory(request: Request, primary: bool = False):
+    """Session factory for a read-only request: a replica, unless ``primary``
+    is asked for or this client wrote recently. For sessions that outlive the
+    route, e.g. in a streamed body"""
+    return async_session if primary or _pinned_to_primary(request) else next(_read_sessions)
+
+async def get_read_db(request: Request):
+    """Session for read-only routes: a replica, unless this client wrote recently"""
+    async with read_session_factory(request)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+def _create_missing_indexes(sync_conn):
+    # create_all only builds indexes together with a new table, so indexes
+    # added to an existing model are created here
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
 async def init_db():
     async with engine.begin() as conn:
         # Create any missing tables
         await conn.run_sync(Base.metadata.create_all)
-        # Add date_modified column if missing (for schema migration)
-        from sqlalchemy import text
-        await conn.execute(text(
-            "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS date_modified TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP"
-        ))
\ No newline at end of file
+        for statement in SCHEMA_UPGRADES:
+            await conn.execute(text(statement))
+        await conn.run_sync(_create_missing_indexes)
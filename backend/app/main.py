@@ -1,21 +1,46 @@
-from fastapi import FastAPI, Depends, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import json
 import logging
-from fastapi.responses import JSONResponse
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from .db.database import get_db, init_db
+from .core import conditional, metrics, profiling
+from .core.query_tracker import QueryTrackingMiddleware
+from .core.negotiation import ContentNegotiationMiddleware, NegotiatedResponse
+from .db.database import get_db, get_read_db, init_db, read_session_factory
 from .models.job import Job as JobModel
-from .schemas.job import Job, JobCreate, JobUpdate
-from .services import job_service
+from .schemas.job import Job, JobChanges, JobCreate, JobUpdate, JobBulkUpdate, BulkResult, FacetCount
+from .services import job_formats, job_ingest, job_service
+from .services.change_feed import change_feed
 
-app = FastAPI(title="Job Organizer API", version="1.0.0")
+# Bodies are MessagePack or JSON per the Accept header, see core/negotiation.py
+app = FastAPI(title="Job Organizer API", version="1.0.0", default_response_class=NegotiatedResponse)
 
 # CORS configuration - environment-aware
-from .core.config import CORS_ORIGINS, is_production
+from .core.config import (
+    CORS_ORIGINS, COMPRESSION_MINIMUM_SIZE, JOBS_SOURCE_PATH, QUERY_TRACKING, is_production,
+    PROFILING_DIR, PROFILING_ENABLED, PROFILING_INTERVAL, PROFILING_MAX_PROFILES, PROFILING_TOKEN
+)
+
+app.add_middleware(ContentNegotiationMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE)
+
+if QUERY_TRACKING:
+    app.add_middleware(QueryTrackingMiddleware)
+
+# Wraps compression and query tracking, so a profile shows all of the
+# request's work: SQL, ORM loading, validation, encoding and compression
+if PROFILING_ENABLED:
+    app.add_middleware(
+        profiling.ProfilingMiddleware, directory=PROFILING_DIR, max_profiles=PROFILING_MAX_PROFILES,
+        interval=PROFILING_INTERVAL, token=PROFILING_TOKEN
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,8 +48,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Changes-Watermark", "ETag", "Last-Modified", "X-Profile-Id"],
 )
 
+# Outermost, so request timings include CORS handling and compression
+app.add_middleware(metrics.MetricsMiddleware, router_app=app)
+
 # Global error handlers
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request, exc):
@@ -52,26 +81,205 @@ async def unexpected_exception_handler(request, exc):
 async def startup_event():
     await init_db()
 
-@app.get("/api/jobs", response_model=List[Job])
-async def get_jobs(
+@app.on_event("shutdown")
+async def shutdown_event():
+    await change_feed.close()
+
+def job_filters(
     status: Optional[str] = None,
     priority: Optional[str] = None,
-    sort_by: str = Query('date_added', description="Sort jobs by 'date_added', 'priority', or 'company'"),
+    q: Optional[str] = Query(None, description="Full-text search, e.g. 'python remote' or '\"data engineer\" -senior'"),
+    tech: Optional[List[str]] = Query(None, description="Technology tag, repeatable: tech=python&tech=fastapi"),
+    requirement: Optional[List[str]] = Query(None, description="Requirement tag, repeatable"),
+    benefit: Optional[List[str]] = Query(None, description="Benefit tag, repeatable"),
+    match: str = Query('all', pattern="^(all|any)$", description="Whether jobs must carry 'all' of the given tags or 'any' of them"),
+):
+    """Filters shared by the job listing endpoints"""
+    return {
+        "status": status,
+        "priority": priority,
+        "q": q,
+        "tech": tech,
+        "requirement": requirement,
+        "benefit": benefit,
+        "match": match,
+    }
+
+async def get_listing_db(request: Request, fresh: bool = False):
+    """Session for the job listing: the primary for a fresh page, whose
+    watermark needs its running transactions, otherwise as get_read_db"""
+    async with read_session_factory(request, primary=fresh)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+def jobs_validators(version, *extra):
+    """ETag/Last-Modified for responses derived from the whole jobs table"""
+    last_modified, total, last_deleted = version
+    return conditional.validators(*version, *extra, last_modified=conditional.latest(last_modified, last_deleted))
+
+@app.get("/api/jobs", response_model=List[Job])
+async def get_jobs(
+    request: Request,
+    response: Response,
+    filters: dict = Depends(job_filters),
+    sort_by: str = Query('date_added', description="Sort jobs by 'date_added', 'date_modified', 'priority', 'company' or 'score'"),
     sort_order: str = Query('desc', description="Sort order: 'asc' or 'desc'"),
     limit: int = Query(100, ge=1),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page; takes precedence over offset"),
+    fields: Optional[str] = Query(None, description="Comma-separated job fields to return, e.g. 'title,company,status'; id and the sort field are always included"),
+    view: Optional[str] = Query(None, description="'summary' for the fields a job card shows, or 'full' (default)"),
+    fresh: bool = Query(False, description="Read from the primary and return, in X-Changes-Watermark, a /api/jobs/changes watermark the page is at least as new as"),
+    db: AsyncSession = Depends(get_listing_db)
+):
+    fields = job_service.parse_job_fields(fields, view)
+    # Taken before the page is read, so no change can fall between the two
+    watermark = await job_service.current_watermark(db) if fresh else None
+    validators = jobs_validators(await job_service.get_jobs_version(db))
+    if watermark:
+        validators["X-Changes-Watermark"] = watermark
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+    headers = dict(validators)
+    jobs = await job_service.get_all_jobs(db, sort_by=sort_by, sort_order=sort_order, limit=limit, offset=offset, cursor=cursor, fields=fields, **filters)
+    next_cursor = job_service.next_cursor(jobs, sort_by, sort_order, limit)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if fields:
+        # Partial jobs do not fit the Job response model; send them as they are
+        return NegotiatedResponse(jsonable_encoder(jobs), headers=headers)
+    response.headers.update(headers)
+    return jobs
+
+@app.get("/api/jobs/search", response_model=List[Job])
+async def search_jobs(
+    filters: dict = Depends(job_filters),
+    limit: int = Query(100, ge=1),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db)
+):
+    q = filters.pop("q")
+    if not q:
+        raise HTTPException(status_code=422, detail="Query parameter 'q' is required")
+    return await job_service.search_jobs(db, q, limit, offset, **filters)
+
+@app.get("/api/jobs/facets", response_model=List[FacetCount])
+async def get_job_facets(
+    field: str = Query('technologies', description="Array to count: 'technologies', 'requirements' or 'benefits'"),
+    limit: int = Query(20, ge=1, le=500),
+    filters: dict = Depends(job_filters),
+    db: AsyncSession = Depends(get_read_db)
+):
+    return await job_service.get_facet_counts(db, field, limit, **filters)
+
+@app.get("/api/jobs/changes", response_model=JobChanges)
+async def get_job_changes(
+    since: Optional[str] = Query(None, description="Watermark from the previous call; omit to get the current watermark before a full load"),
+    limit: int = Query(1000, ge=1, le=10000),
+    fields: Optional[str] = Query(None, description="Comma-separated job fields to return; id and date_modified are always included"),
+    view: Optional[str] = Query(None, description="'summary' for the fields a job card shows, or 'full' (default)"),
+    # The primary, never a replica: watermarks follow its running transactions
     db: AsyncSession = Depends(get_db)
 ):
-    return await job_service.get_all_jobs(db, status, priority, sort_by, sort_order, limit, offset)
+    fields = job_service.parse_job_fields(fields, view)
+    changes = await job_service.get_job_changes(db, since, limit, fields)
+    if fields:
+        return NegotiatedResponse(jsonable_encoder(changes))
+    return changes
+
+# Comment line sent when the feed is quiet, so proxies keep the stream open
+SSE_HEARTBEAT_SECONDS = 15
+
+@app.get("/api/jobs/events")
+async def job_events(request: Request):
+    """Server-Sent Events stream of job changes.
+
+    Each ``change`` event carries ``{op, ids, total, status, priority}``: the
+    ids written (null when too many) and the count deltas. A ``resync`` event
+    means events were lost; reload via /api/jobs/changes and /api/stats.
+    """
+    async def stream():
+        async with change_feed.subscribe() as queue:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                name = "resync" if event.get("op") == "resync" else "change"
+                yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/jobs/export")
+async def export_jobs(
+    request: Request,
+    format: str = Query('ndjson', pattern="^(ndjson|csv)$", description="'ndjson' (one job object per line) or 'csv'"),
+    include_responses: bool = Query(False, description="Add each job's responses: nested in NDJSON, one row per response in CSV"),
+    filters: dict = Depends(job_filters)
+):
+    """Every job matching the filters, in id order, streamed as it is read.
+
+    Rows come from a server-side cursor in chunks, so memory stays flat
+    however many jobs there are and the first bytes leave at once.
+    """
+    # The session lives as long as the body, not the route
+    session_factory = read_session_factory(request)
+    columns = job_service.EXPORT_COLUMNS
+    response_columns = job_service.EXPORT_RESPONSE_COLUMNS if include_responses else ()
+
+    async def stream():
+        async with session_factory() as db:
+            chunks = job_service.export_jobs(db, include_responses, **filters)
+            async for data in job_formats.encoder(format)(chunks, columns, response_columns):
+                yield data
+
+    filename = f"jobs-{datetime.utcnow():%Y%m%d}.{format}"
+    return StreamingResponse(
+        stream(),
+        media_type=job_formats.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @app.get("/api/jobs/{job_id}", response_model=Job)
-async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+async def get_job(job_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
+    date_modified = await job_service.get_job_version(db, job_id)
+    validators = conditional.validators(job_id, date_modified, last_modified=date_modified)
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+    response.headers.update(validators)
     return await job_service.get_job(db, job_id)
 
 @app.post("/api/jobs", response_model=Job)
 async def create_job(job_data: JobCreate, db: AsyncSession = Depends(get_db)):
     return await job_service.create_job(db, job_data)
 
+def _bulk_result(results):
+    return {
+        "processed": len(results),
+        "succeeded": sum(1 for item in results if item["result"] != "not_found"),
+        "results": results,
+    }
+
+@app.post("/api/jobs/bulk", response_model=BulkResult)
+async def bulk_create_jobs(items: List[JobCreate], db: AsyncSession = Depends(get_db)):
+    return _bulk_result(await job_service.bulk_create_jobs(db, items))
+
+@app.patch("/api/jobs/bulk", response_model=BulkResult)
+async def bulk_update_jobs(items: List[JobBulkUpdate], db: AsyncSession = Depends(get_db)):
+    return _bulk_result(await job_service.bulk_update_jobs(db, items))
+
+@app.post("/api/jobs/rescore")
+async def rescore_jobs(db: AsyncSession = Depends(get_db)):
+    return await job_service.rescore_jobs(db)
+
 @app.patch("/api/jobs/{job_id}", response_model=Job)
 async def update_job(
     job_id: int, 
@@ -85,9 +293,63 @@ async def delete_job(job_id: int, db: AsyncSession = Depends(get_db)):
     await job_service.delete_job(db, job_id)
     return {"message": "Job deleted successfully"}
 
+@app.post("/api/import/markdown")
+async def import_markdown(db: AsyncSession = Depends(get_db)):
+    return await job_service.import_jobs_from_markdown(db, JOBS_SOURCE_PATH)
+
+@app.post("/api/jobs/import")
+async def import_jobs(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$", description="'ndjson' or 'csv'; taken from the Content-Type when omitted"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk-load jobs from a CSV or NDJSON request body (the export formats).
+
+    The body is validated and staged as it streams in, then merged in one
+    statement: duplicates and tombstoned jobs are skipped, and invalid
+    records are counted and the first few reported.
+    """
+    fmt = format or job_ingest.format_for(content_type=request.headers.get("content-type"))
+    return await job_ingest.ingest_jobs(db, request.stream(), fmt)
+
 @app.get("/api/stats")
-async def get_job_stats(db: AsyncSession = Depends(get_db)):
-    return await job_service.get_job_stats(db)
+async def get_job_stats(
+    request: Request,
+    response: Response,
+    dimensions: Optional[str] = Query(None, description="Comma-separated extra breakdowns: 'type', 'score' (histogram), 'weekly' (jobs added per week)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    dimensions = job_service.parse_stats_dimensions(dimensions)
+    version = await job_service.get_jobs_version(db)
+    validators = jobs_validators(version)
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+    response.headers.update(validators)
+    return await job_service.get_job_stats(db, dimensions, version)
+
+def _require_profiling(request: Request):
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if PROFILING_TOKEN and request.headers.get("x-profile") != PROFILING_TOKEN:
+        raise HTTPException(status_code=403, detail="X-Profile token required")
+
+@app.get("/api/profiles", dependencies=[Depends(_require_profiling)])
+async def list_profiles():
+    """Recently captured request profiles, newest first"""
+    return await asyncio.to_thread(profiling.list_profiles, PROFILING_DIR)
+
+@app.get("/api/profiles/{profile_id}", dependencies=[Depends(_require_profiling)])
+async def get_profile(profile_id: str, format: str = Query('speedscope', description="'speedscope' (flame graph JSON for speedscope.app) or 'html'")):
+    path = profiling.profile_file(PROFILING_DIR, profile_id, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    suffix, media_type = profiling.FORMATS[format]
+    return FileResponse(path, media_type=media_type, filename=f"{profile_id}{suffix}")
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint, see core/metrics.py"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 if __name__ == "__main__":
     import uvicorn
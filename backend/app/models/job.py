@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, ForeignKey, ARRAY, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Text, Enum, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from datetime import datetime
 import enum
@@ -37,8 +38,22 @@ class Job(Base):
     __tablename__ = "jobs"
     __table_args__ = (
         Index('ix_jobs_status', 'status'),
-        Index('ix_jobs_priority', 'priority'),
-        Index('ix_jobs_date_added', 'date_added'),
+        # Composite (sort key, id) indexes backing keyset pagination; a btree
+        # scans backwards just as well, so one index serves asc and desc.
+        Index('ix_jobs_date_added_id', 'date_added', 'id'),
+        Index('ix_jobs_date_modified_id', 'date_modified', 'id'),
+        Index('ix_jobs_priority_id', 'priority', 'id'),
+        Index('ix_jobs_company_id', 'company', 'id'),
+        Index('ix_jobs_score_id', 'score', 'id'),
+        Index('ix_jobs_search_vector', 'search_vector', postgresql_using='gin'),
+        # Array containment (@>) and overlap (&&) filters
+        Index('ix_jobs_technologies', 'technologies', postgresql_using='gin'),
+        Index('ix_jobs_requirements', 'requirements', postgresql_using='gin'),
+        Index('ix_jobs_benefits', 'benefits', postgresql_using='gin'),
+        # (title, company, location) identifies a posting for import dedup
+        Index('ix_jobs_signature', 'title', 'company', 'location'),
+        # Commit-ordered change feed (GET /api/jobs/changes)
+        Index('ix_jobs_change_xid_id', 'change_xid', 'id'),
     )
     
     id = Column(Integer, primary_key=True, index=True)
@@ -58,6 +73,10 @@ class Job(Base):
     situation = Column(Text)
     date_added = Column(DateTime, default=datetime.utcnow)
     date_modified = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Weighted full-text document, maintained by the jobs_search_vector_trigger
+    search_vector = deferred(Column(TSVECTOR))
+    # Id of the transaction that last wrote the row, set by jobs_change_xid_trigger
+    change_xid = deferred(Column(BigInteger, nullable=False, server_default='0'))
     
     # Relationships
     responses = relationship("JobResponse", back_populates="job", cascade="all, delete-orphan")
@@ -76,10 +95,29 @@ class JobResponse(Base):
 
 class DeletedJob(Base):
     __tablename__ = "deleted_jobs"
+    __table_args__ = (
+        Index('ix_deleted_jobs_signature', 'title', 'company', 'location'),
+        # Newest tombstone (jobs collection version)
+        Index('ix_deleted_jobs_deleted_at', 'deleted_at'),
+        Index('ix_deleted_jobs_change_xid', 'change_xid'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     company = Column(String, nullable=False)
     location = Column(String, nullable=False)
     contact_website = Column(String)
-    deleted_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    # id the job had, so clients syncing changes can drop it
+    job_id = Column(Integer)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+    # Id of the deleting transaction, for GET /api/jobs/changes
+    change_xid = Column(BigInteger, nullable=False, server_default='0')
+
+class JobStat(Base):
+    """Running job count per dimension value ('total', 'status', 'priority'),
+    kept current by the job_stats_trigger statement triggers on jobs"""
+    __tablename__ = "job_stats"
+
+    dimension = Column(String, primary_key=True)
+    value = Column(String, primary_key=True, default='')
+    count = Column(BigInteger, nullable=False, default=0)
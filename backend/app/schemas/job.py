@@ -58,6 +58,19 @@ class JobUpdate(BaseModel):
     comments: Optional[str] = None
     situation: Optional[str] = None
 
+class JobBulkUpdate(JobUpdate):
+    id: int
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    result: str
+
+class BulkResult(BaseModel):
+    processed: int
+    succeeded: int
+    results: List[BulkItemResult]
+
 class JobResponseCreate(BaseModel):
     status: str
     notes: Optional[str] = None
@@ -83,4 +96,14 @@ class Job(JobCreate):
     responses: List[JobResponse] = []
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class JobChanges(BaseModel):
+    jobs: List[Job]
+    removed: List[int]
+    watermark: str
+    has_more: bool
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
@@ -0,0 +1,97 @@
+"""
+Live feed of job changes.
+
+The jobs_notify_change triggers publish one NOTIFY per write statement on the
+``job_changes`` channel. JobChangeFeed LISTENs on a single primary connection
+and fans each payload out to the subscribed clients (GET /api/jobs/events),
+so the number of database connections does not grow with the audience.
+"""
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional, Set
+
+from ..db.database import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "job_changes"
+
+# Sent instead of queued events when a subscriber fell behind or the feed
+# reconnected: the client should resync (GET /api/jobs/changes, /api/stats)
+RESYNC = {"op": "resync"}
+
+
+class JobChangeFeed:
+    def __init__(self, queue_size: int = 100, retry_delay: float = 1.0):
+        self.queue_size = queue_size
+        self.retry_delay = retry_delay
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def subscribe(self):
+        """Queue of change events for one client, open for the block's duration"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers:
+                await self.close()
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _publish(self, event: dict):
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A slow client loses the backlog and resyncs instead
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            self._publish(json.loads(payload))
+        except ValueError:
+            logger.warning(f"Ignoring malformed {CHANNEL} payload: {payload!r}")
+
+    async def _listen(self):
+        reconnecting = False
+        while True:
+            try:
+                async with engine.connect() as conn:
+                    raw = (await conn.get_raw_connection()).driver_connection
+                    lost = asyncio.Event()
+                    raw.add_termination_listener(lambda _: lost.set())
+                    await raw.add_listener(CHANNEL, self._on_notify)
+                    if reconnecting:
+                        # Notifications sent while disconnected are gone
+                        self._publish(RESYNC)
+                    try:
+                        await lost.wait()
+                    finally:
+                        if not raw.is_closed():
+                            await raw.remove_listener(CHANNEL, self._on_notify)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"Job change feed connection failed: {exc}")
+            reconnecting = True
+            await asyncio.sleep(self.retry_delay)
+
+
+change_feed = JobChangeFeed()
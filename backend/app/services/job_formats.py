@@ -0,0 +1,134 @@
+"""
+Line formats for moving many jobs in and out: NDJSON and CSV.
+
+NDJSON carries one job object per line, with list fields as JSON arrays and
+(on export with responses) a nested ``responses`` array. CSV has one row per
+job, or per job and response, with list fields packed into one cell as
+``item|item``; a ``|`` or ``\\`` inside an item is escaped with ``\\``.
+Dates are ISO 8601 in both.
+"""
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Sequence
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+LIST_FIELDS = ("technologies", "requirements", "benefits")
+LIST_SEPARATOR = "|"
+_ESCAPE = "\\"
+
+
+def encode_list(items: Sequence[str]) -> str:
+    """Pack a list field into one CSV cell"""
+    return LIST_SEPARATOR.join(
+        str(item).replace(_ESCAPE, _ESCAPE * 2).replace(LIST_SEPARATOR, _ESCAPE + LIST_SEPARATOR)
+        for item in items or ()
+    )
+
+
+def decode_list(cell: str) -> List[str]:
+    """Unpack a CSV cell written by encode_list; an empty cell is no items"""
+    if not cell:
+        return []
+    if _ESCAPE not in cell:
+        return cell.split(LIST_SEPARATOR)
+    items, current, escaped = [], [], False
+    for char in cell:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == _ESCAPE:
+            escaped = True
+        elif char == LIST_SEPARATOR:
+            items.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    items.append("".join(current))
+    return items
+
+
+def _plain(value):
+    """A column value as JSON/CSV sees it"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return encode_list(value)
+    return _plain(value)
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_plain)
+    return json.dumps(obj, default=_plain, separators=(",", ":")).encode()
+
+
+async def ndjson_lines(
+    chunks: AsyncIterator[Sequence[dict]], columns: Sequence[str], response_columns: Sequence[str] = ()
+) -> AsyncIterator[bytes]:
+    """Encode chunks of job rows, yielding one block of lines per chunk.
+
+    With ``response_columns`` the rows come from a job/response join ordered
+    by job: consecutive rows of one job fold into its ``responses`` array,
+    also across chunk boundaries.
+    """
+    pending = None
+    async for rows in chunks:
+        lines = []
+        for row in rows:
+            if not response_columns:
+                lines.append(_dumps({name: row[name] for name in columns}))
+                continue
+            if pending is None or pending["id"] != row["id"]:
+                if pending is not None:
+                    lines.append(_dumps(pending))
+                pending = {name: row[name] for name in columns}
+                pending["responses"] = []
+            if row[response_columns[0]] is not None:
+                pending["responses"].append({
+                    name[len("response_"):]: row[name] for name in response_columns
+                })
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+    if pending is not None:
+        yield _dumps(pending) + b"\n"
+
+
+async def csv_lines(
+    chunks: AsyncIterator[Sequence[dict]], columns: Sequence[str], response_columns: Sequence[str] = ()
+) -> AsyncIterator[bytes]:
+    """Encode chunks of rows as CSV: the header at once, then a block per chunk"""
+    header = list(columns) + list(response_columns)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue().encode()
+    async for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_cell(row[name]) for name in header] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+def encoder(fmt: str):
+    """The line encoder for ``fmt`` ('ndjson' or 'csv')"""
+    return {"ndjson": ndjson_lines, "csv": csv_lines}[fmt]
@@ -0,0 +1,231 @@
+"""
+Bulk job ingest from CSV or NDJSON (see job_formats).
+
+The upload is decoded, split into records and validated against JobCreate
+as it arrives, and the valid jobs are scored and COPYed into a temporary
+staging table ``batch_size`` at a time, so memory stays bounded by one
+batch however large the file. A single INSERT ... SELECT then merges the
+staging table into jobs: the first occurrence of each (title, company,
+location) signature is kept, and signatures that already exist or have a
+deleted_jobs tombstone are left out, the same rules as the markdown import.
+Everything happens in one transaction, so a failed load leaves no trace.
+"""
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..schemas.job import JobCreate
+from .job_formats import LIST_FIELDS, decode_list, orjson
+from .scoring import score_batch
+
+INGEST_BATCH_SIZE = 10_000
+# Invalid records are all counted, but only the first few are described
+MAX_REPORTED_ERRORS = 20
+
+STAGING_COLUMNS = (
+    'line', 'title', 'company', 'location', 'contact_website', 'description',
+    'type', 'status', 'technologies', 'requirements', 'benefits', 'comments',
+    'situation', 'score', 'priority'
+)
+_JOB_COLUMNS = ', '.join(STAGING_COLUMNS[1:])
+_CSV_FIELDS = frozenset(JobCreate.model_fields)
+
+_CREATE_STAGING = f"""
+CREATE TEMP TABLE job_ingest ON COMMIT DROP AS
+SELECT 0::bigint AS line, {_JOB_COLUMNS} FROM jobs WITH NO DATA
+"""
+
+# Concurrent ingests merge one at a time, so neither misses the other's rows
+_MERGE_LOCK = "SELECT pg_advisory_xact_lock(hashtext('job_ingest'))"
+
+# Rows are stamped when the merge writes them, not when the upload began
+_MERGE = f"""
+WITH stamp AS (
+    SELECT timezone('utc', clock_timestamp()) AS at
+), inserted AS (
+    INSERT INTO jobs ({_JOB_COLUMNS}, date_added, date_modified)
+    SELECT {_JOB_COLUMNS}, stamp.at, stamp.at
+    FROM job_ingest s, stamp
+    WHERE s.line IN (SELECT min(line) FROM job_ingest GROUP BY title, company, location)
+      AND NOT EXISTS (
+        SELECT 1 FROM jobs j
+        WHERE j.title = s.title AND j.company = s.company AND j.location = s.location
+      )
+      AND NOT EXISTS (
+        SELECT 1 FROM deleted_jobs d
+        WHERE d.title = s.title AND d.company = s.company AND d.location = s.location
+      )
+    ORDER BY s.line
+    RETURNING 1
+)
+SELECT
+    (SELECT count(*) FROM inserted),
+    (SELECT count(DISTINCT (title, company, location)) FROM job_ingest s WHERE EXISTS (
+        SELECT 1 FROM deleted_jobs d
+        WHERE d.title = s.title AND d.company = s.company AND d.location = s.location
+    ))
+"""
+
+
+def format_for(filename: Optional[str] = None, content_type: Optional[str] = None) -> str:
+    """'csv' or 'ndjson', guessed from a file name or media type"""
+    if (filename or '').lower().endswith('.csv') or 'csv' in (content_type or ''):
+        return 'csv'
+    return 'ndjson'
+
+
+async def _decoded(chunks: AsyncIterator[bytes]):
+    # utf-8-sig drops the byte order mark spreadsheet exports start with
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    try:
+        async for chunk in chunks:
+            if chunk:
+                yield decoder.decode(chunk)
+        yield decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Upload is not valid UTF-8")
+
+
+async def _whole_records(chunks: AsyncIterator[bytes], quoted: bool):
+    """Text blocks that end on a record boundary. With ``quoted`` (CSV), a
+    newline inside a quoted field is not one: it follows an odd number of
+    quotes since the block began."""
+    pending = ''
+    async for block in _decoded(chunks):
+        pending += block
+        end = pending.rfind('\n') + 1
+        if not end or (quoted and pending.count('"', 0, end) % 2):
+            continue
+        yield pending[:end]
+        pending = pending[end:]
+    if pending:
+        yield pending
+
+
+async def _ndjson_records(chunks):
+    loads = orjson.loads if orjson is not None else json.loads
+    number = 0
+    async for block in _whole_records(chunks, quoted=False):
+        # Only \n ends a record: JSON strings may hold other line separators
+        lines = block.split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        for line in lines:
+            number += 1
+            if not line.strip():
+                continue
+            try:
+                yield number, loads(line), None
+            except ValueError as exc:
+                yield number, None, f"invalid JSON: {exc}"
+
+
+def _csv_record(header, row):
+    record = {}
+    for name, cell in zip(header, row):
+        if name not in _CSV_FIELDS:
+            continue
+        if name in LIST_FIELDS:
+            record[name] = decode_list(cell)
+        elif cell != '':
+            # An empty cell means "not given": null, the default or missing
+            record[name] = cell
+    return record
+
+
+async def _csv_records(chunks):
+    header = None
+    number = 0
+    async for block in _whole_records(chunks, quoted=True):
+        for row in csv.reader(io.StringIO(block)):
+            if not any(row):
+                continue
+            if header is None:
+                header = [name.strip() for name in row]
+                continue
+            number += 1
+            if len(row) != len(header):
+                yield number, None, f"expected {len(header)} fields, found {len(row)}"
+            else:
+                yield number, _csv_record(header, row), None
+
+
+def _describe(exc: ValidationError) -> str:
+    return '; '.join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors())
+
+
+async def _stage(raw, batch, now: datetime):
+    """Score a batch of (line, job dict) and COPY it into job_ingest"""
+    jobs = [job for _, job in batch]
+    scores, priorities = score_batch(jobs, now=now)
+    records = [
+        (
+            line, job['title'], job['company'], job['location'], job['contact_website'],
+            job['description'], job['type'].value, job['status'].value, job['technologies'],
+            job['requirements'], job['benefits'], job['comments'], job['situation'],
+            score, priority.value
+        )
+        for (line, job), score, priority in zip(batch, scores.tolist(), priorities)
+    ]
+    await raw.copy_records_to_table('job_ingest', records=records, columns=STAGING_COLUMNS)
+
+
+async def ingest_jobs(db: AsyncSession, chunks: AsyncIterator[bytes], fmt: str = 'ndjson', batch_size: int = INGEST_BATCH_SIZE):
+    """Load jobs from a stream of CSV or NDJSON bytes and commit them.
+
+    Returns counts of the records received, jobs inserted, duplicates
+    skipped (within the upload or already stored), tombstoned signatures
+    and invalid records, plus the first MAX_REPORTED_ERRORS problems by
+    record number (NDJSON line, or CSV data row).
+    """
+    counts = {"received": 0, "inserted": 0, "skipped": 0, "tombstoned": 0, "invalid": 0}
+    errors = []
+    now = datetime.utcnow()
+    records = _csv_records(chunks) if fmt == 'csv' else _ndjson_records(chunks)
+
+    # Creating the table through the session opens its transaction, which
+    # the raw COPYs below then join
+    await db.execute(text(_CREATE_STAGING))
+    raw = (await (await db.connection()).get_raw_connection()).driver_connection
+    staged = 0
+    batch = []
+    async for number, record, problem in records:
+        counts["received"] += 1
+        if problem is None and not isinstance(record, dict):
+            problem = "not a JSON object"
+        if problem is None:
+            try:
+                batch.append((number, JobCreate(**record).dict()))
+            except ValidationError as exc:
+                problem = _describe(exc)
+        if problem is not None:
+            counts["invalid"] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"record": number, "error": problem})
+            continue
+        if len(batch) >= batch_size:
+            await _stage(raw, batch, now)
+            staged += len(batch)
+            batch = []
+    if batch:
+        await _stage(raw, batch, now)
+        staged += len(batch)
+
+    if staged:
+        # The planner needs row counts to pick hash joins for a big load
+        await raw.execute("ANALYZE job_ingest")
+        await raw.execute(_MERGE_LOCK)
+        inserted, tombstoned = await raw.fetchrow(_MERGE)
+        counts["inserted"] = inserted
+        counts["tombstoned"] = tombstoned
+        counts["skipped"] = staged - inserted - tombstoned
+    await db.commit()
+    return {"message": f"Successfully imported {counts['inserted']} jobs", **counts, "errors": errors}
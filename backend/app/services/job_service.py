@@ -1,55 +1,382 @@
 """
 Service layer for Job operations.
 """
-import time
+import base64
+import json
 from typing import Optional
-
-# In-process cache for job stats
-_stats_cache = None
-_stats_cache_timestamp = 0
-_STATS_TTL = 60
 from datetime import datetime
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
-from sqlalchemy.orm import selectinload
+from pydantic import ValidationError
+from sqlalchemy import Integer, String, column, insert, literal_column, select, text, union_all, update, values, and_, func, literal, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import selectinload, undefer
 
-from ..models.job import Job, JobResponse, DeletedJob, JobStatus, Priority
+from ..core.metrics import STATS_CACHE
+from ..models.job import Job, JobResponse, DeletedJob, JobStat, JobStatus, Priority
+from ..schemas.job import JobCreate
+from .markdown_parser import parse_markdown_jobs
+from .scoring import score_batch
 import os
 
 
-async def get_all_jobs(db: AsyncSession, status: str = None, priority: str = None, sort_by: str = 'date_added', sort_order: str = 'desc', limit: int = 100, offset: int = 0):
-    query = select(Job).options(selectinload(Job.responses))
+# Columns the job list can be ordered by; each has a matching (column, id)
+# index so keyset pages are a single index range scan
+SORT_COLUMNS = {
+    'date_added': Job.date_added,
+    'date_modified': Job.date_modified,
+    'priority': Job.priority,
+    'company': Job.company,
+    'score': Job.score
+}
 
-    # Filtering
+
+def _normalize_sort(sort_by: str, sort_order: str):
+    if sort_by not in SORT_COLUMNS:
+        sort_by = 'date_added'
+    return sort_by, 'desc' if sort_order == 'desc' else 'asc'
+
+
+def _field(job, name: str):
+    # Listings hold Job objects, or plain dicts for a sparse fieldset
+    return job[name] if isinstance(job, dict) else getattr(job, name)
+
+
+def _sort_value(job, sort_by: str):
+    value = _field(job, sort_by)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Priority):
+        return value.value
+    return value
+
+
+def encode_cursor(job, sort_by: str, sort_order: str) -> str:
+    """Encode the position after ``job`` as an opaque, URL-safe cursor."""
+    payload = [sort_by, sort_order, _sort_value(job, sort_by), _field(job, 'id')]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str):
+    """Return the (sort value, id) pair stored in ``cursor``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort_by, cursor_sort_order, value, last_id = json.loads(raw)
+        if (cursor_sort_by, cursor_sort_order) != (sort_by, sort_order):
+            raise ValueError("cursor was issued for a different ordering")
+        if value is not None:
+            if sort_by in ('date_added', 'date_modified'):
+                value = datetime.fromisoformat(value)
+            elif sort_by == 'priority':
+                value = Priority(value)
+        return value, int(last_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {exc}")
+
+
+def next_cursor(jobs, sort_by: str, sort_order: str, limit: int) -> Optional[str]:
+    """Cursor for the page following ``jobs``, or None on the last page."""
+    if not jobs or len(jobs) < limit:
+        return None
+    sort_by, sort_order = _normalize_sort(sort_by, sort_order)
+    return encode_cursor(jobs[-1], sort_by, sort_order)
+
+
+def _keyset_segments(sort_column, descending: bool, value, last_id: int):
+    """Conditions selecting the rows after (value, last_id), in list order.
+
+    Postgres sorts NULLs last ascending and first descending. Rather than one
+    OR-ed predicate, which the planner can only apply as a filter, the rest of
+    the cursor's segment and the following NULL/non-NULL segment are returned
+    separately so each is an index range scan.
+    """
+    if value is None:
+        segments = [and_(sort_column.is_(None), Job.id < last_id if descending else Job.id > last_id)]
+        if descending:
+            segments.append(sort_column.isnot(None))
+        return segments
+    bound = tuple_(literal(value, sort_column.type), last_id)
+    if descending:
+        return [tuple_(sort_column, Job.id) < bound]
+    segments = [tuple_(sort_column, Job.id) > bound]
+    if sort_column.nullable:
+        segments.append(sort_column.is_(None))
+    return segments
+
+
+def _search_query(q: str):
+    return func.websearch_to_tsquery('english', q)
+
+
+# Array columns that can be filtered by tag and counted as facets
+FACET_COLUMNS = {
+    'technologies': Job.technologies,
+    'requirements': Job.requirements,
+    'benefits': Job.benefits
+}
+
+
+def _tag_condition(column, values, match: str):
+    # @> (contains all) and && (overlaps any) are both served by the GIN index
+    return column.overlap(values) if match == 'any' else column.contains(values)
+
+
+def _apply_filters(query, status: str = None, priority: str = None, q: str = None, tech: list = None, requirement: list = None, benefit: list = None, match: str = 'all'):
     if status:
         query = query.where(Job.status == status)
     if priority:
         query = query.where(Job.priority == priority)
+    if q:
+        query = query.where(Job.search_vector.op('@@')(_search_query(q)))
+    if tech:
+        query = query.where(_tag_condition(Job.technologies, tech, match))
+    if requirement:
+        query = query.where(_tag_condition(Job.requirements, requirement, match))
+    if benefit:
+        query = query.where(_tag_condition(Job.benefits, benefit, match))
+    return query
+
+
+# Fields a listing can be narrowed to with ``fields=``; 'responses' is the
+# relationship, every other name is a jobs column
+JOB_FIELDS = (
+    'id', 'title', 'company', 'location', 'contact_website', 'description',
+    'type', 'status', 'priority', 'score', 'technologies', 'requirements',
+    'benefits', 'comments', 'situation', 'date_added', 'date_modified', 'responses'
+)
+
+# Named fieldsets for ``view=``; 'summary' is what a job card shows
+LISTING_VIEWS = {
+    'summary': ('title', 'company', 'location', 'status', 'type', 'priority'),
+}
+
+
+def parse_job_fields(fields: Optional[str] = None, view: Optional[str] = None):
+    """Field names for a sparse listing, or None for full Job objects."""
+    if view not in (None, 'full', *LISTING_VIEWS):
+        raise HTTPException(status_code=400, detail=f"Unknown view: {view}")
+    requested = list(LISTING_VIEWS.get(view, ()))
+    requested += [name.strip() for name in (fields or '').split(',') if name.strip()]
+    if not requested:
+        return None
+    unknown = [name for name in requested if name not in JOB_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(requested))
+
+
+async def _attach_responses(db: AsyncSession, jobs):
+    ids = [job['id'] for job in jobs]
+    result = await db.execute(
+        select(JobResponse.job_id, JobResponse.id, JobResponse.date, JobResponse.status, JobResponse.notes)
+        .where(JobResponse.job_id.in_(ids))
+        .order_by(JobResponse.id)
+    )
+    responses = {job_id: [] for job_id in ids}
+    for job_id, *response in result.all():
+        responses[job_id].append(dict(zip(('id', 'date', 'status', 'notes'), response)))
+    for job in jobs:
+        job['responses'] = responses[job['id']]
 
-    # Sorting
-    sort_column_map = {
-        'date_added': Job.date_added,
-        'date_modified': Job.date_modified,
-        'priority': Job.priority,
-        'company': Job.company,
-        'score': Job.score
-    }
 
-    sort_column = sort_column_map.get(sort_by, Job.date_added)
+def _job_query(fields, *required):
+    """Select of full Job objects, or of just ``fields`` (plus id and
+    ``required``), and the function turning its result into the job list."""
+    if not fields:
+        return select(Job).options(selectinload(Job.responses)), lambda result: result.scalars().all()
+    names = dict.fromkeys(('id', *fields, *required))
+    names.pop('responses', None)
+    query = select(*[getattr(Job, name) for name in names])
+    return query, lambda result: [dict(row) for row in result.mappings()]
 
-    if sort_order == 'desc':
-        query = query.order_by(sort_column.desc())
+
+async def get_all_jobs(db: AsyncSession, status: str = None, priority: str = None, sort_by: str = 'date_added', sort_order: str = 'desc', limit: int = 100, offset: int = 0, cursor: str = None, fields=None, **filters):
+    """Jobs matching the filters, one page at a time.
+
+    With ``fields`` (see parse_job_fields) only those columns are selected and
+    each job is a plain dict, always including ``id`` and the sort column so
+    the next cursor can be derived; responses are only loaded when asked for.
+    """
+    sort_by, sort_order = _normalize_sort(sort_by, sort_order)
+    sort_column = SORT_COLUMNS[sort_by]
+
+    query, fetch = _job_query(fields, sort_by)
+
+    # Filtering
+    query = _apply_filters(query, status, priority, **filters)
+
+    # Sorting, with id as tie-breaker so the order is total
+    descending = sort_order == 'desc'
+
+    if descending:
+        query = query.order_by(sort_column.desc(), Job.id.desc())
     else:
-        query = query.order_by(sort_column.asc())
+        query = query.order_by(sort_column.asc(), Job.id.asc())
 
-    # Pagination
-    query = query.limit(limit).offset(offset)
-    result = await db.execute(query)
-    jobs = result.scalars().all()
+    # Pagination: a cursor seeks straight to the next page instead of
+    # scanning and discarding ``offset`` rows
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_by, sort_order)
+        jobs = []
+        for condition in _keyset_segments(sort_column, descending, value, last_id):
+            result = await db.execute(query.where(condition).limit(limit - len(jobs)))
+            jobs.extend(fetch(result))
+            if len(jobs) >= limit:
+                break
+    else:
+        query = query.limit(limit).offset(offset)
+        result = await db.execute(query)
+        jobs = fetch(result)
 
+    if fields and 'responses' in fields and jobs:
+        await _attach_responses(db, jobs)
     return jobs
 
+# Rows fetched per round trip from the export's server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = tuple(name for name in JOB_FIELDS if name != 'responses')
+EXPORT_RESPONSE_COLUMNS = ('response_id', 'response_date', 'response_status', 'response_notes')
+
+
+async def export_jobs(db: AsyncSession, include_responses: bool = False, chunk_size: int = EXPORT_CHUNK_SIZE, **filters):
+    """Yield the jobs matching ``filters`` in id order, as lists of row
+    mappings read ``chunk_size`` at a time from a server-side cursor, so the
+    whole table is never held in memory.
+
+    With ``include_responses`` each row also carries the EXPORT_RESPONSE_COLUMNS
+    of one response, from a single LEFT JOIN ordered by job and response
+    date: a job appears once per response (or once with None values)."""
+    query = select(*[getattr(Job, name) for name in EXPORT_COLUMNS])
+    order = [Job.id]
+    if include_responses:
+        query = query.add_columns(
+            JobResponse.id.label('response_id'), JobResponse.date.label('response_date'),
+            JobResponse.status.label('response_status'), JobResponse.notes.label('response_notes')
+        ).outerjoin(JobResponse, JobResponse.job_id == Job.id)
+        order += [JobResponse.date, JobResponse.id]
+    query = _apply_filters(query, **filters).order_by(*order)
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    async for rows in result.mappings().partitions():
+        yield rows
+
+
+def encode_watermark(xid: int, last_id: int = 0, running=()) -> str:
+    """Opaque, URL-safe position in the (change_xid, id) change order, with
+    the transactions below it that were still running and may commit later."""
+    raw = json.dumps([xid, last_id, sorted(running)], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_watermark(watermark: str):
+    try:
+        raw = base64.urlsafe_b64decode(watermark + '=' * (-len(watermark) % 4))
+        xid, last_id, running = json.loads(raw)
+        return int(xid), int(last_id), [int(other) for other in running]
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid watermark: {exc}")
+
+
+async def _snapshot(db: AsyncSession):
+    """``(xmax, running)`` of a fresh snapshot: every transaction id below
+    xmax has committed or aborted, except the ``running`` ones"""
+    snapshot = (await db.execute(text("SELECT pg_current_snapshot()::text"))).scalar_one()
+    _, xmax, running = snapshot.split(':')
+    return int(xmax), [int(xid) for xid in running.split(',') if xid]
+
+
+async def current_watermark(db: AsyncSession) -> str:
+    """Watermark of the changes committed so far. Anything read in this
+    session afterwards is at least as new, so syncing from it misses nothing."""
+    xmax, running = await _snapshot(db)
+    return encode_watermark(xmax, 0, running)
+
+
+async def get_job_changes(db: AsyncSession, since: Optional[str] = None, limit: int = 1000, fields=None):
+    """Jobs modified and ids removed after the ``since`` watermark.
+
+    Changes are ordered by the id of the transaction that wrote them
+    (change_xid, stamped by triggers), not by date_modified: a clock stamp
+    is taken before its transaction commits, so a slow transaction could
+    land behind a watermark already handed out. Transaction ids below the
+    snapshot's xmax are final except for the ones still running, which the
+    watermark carries and the next call checks again. Both lookups are range
+    scans, on ix_jobs_change_xid_id and ix_deleted_jobs_change_xid.
+
+    Needs the primary: a replica neither has the latest commits nor knows
+    which transactions are running. Without ``since`` only the current
+    watermark is returned, to be fetched before an initial full load. When
+    ``has_more`` is set, call again with the returned watermark.
+    """
+    if not since:
+        return {"jobs": [], "removed": [], "watermark": await current_watermark(db), "has_more": False}
+    xmax, running = await _snapshot(db)
+    since_xid, since_id, since_running = decode_watermark(since)
+
+    query, fetch = _job_query(fields, 'date_modified', 'change_xid')
+    if not fields:
+        query = query.options(undefer(Job.change_xid))
+    position = tuple_(Job.change_xid, Job.id) > tuple_(literal(since_xid), literal(since_id))
+    if since_running:
+        position = position | Job.change_xid.in_(since_running)
+    result = await db.execute(
+        query.where(position, Job.change_xid < xmax).order_by(Job.change_xid, Job.id).limit(limit)
+    )
+    jobs = fetch(result)
+
+    has_more = len(jobs) == limit
+    if has_more:
+        last_xid, last_id = _field(jobs[-1], 'change_xid'), _field(jobs[-1], 'id')
+        watermark = (last_xid, last_id, [xid for xid in running if xid < last_xid])
+        # Tombstones of the last transaction are all visible, so all sent now
+        removed_through = last_xid
+    else:
+        watermark = (xmax, 0, running)
+        removed_through = xmax - 1
+
+    # A watermark ending inside a transaction has sent its tombstones already
+    removal = DeletedJob.change_xid > (since_xid if since_id else since_xid - 1)
+    if since_running:
+        removal = removal | DeletedJob.change_xid.in_(since_running)
+    removed = await db.execute(
+        select(DeletedJob.job_id)
+        .where(removal, DeletedJob.change_xid <= removed_through, DeletedJob.job_id.isnot(None))
+    )
+    if fields:
+        for job in jobs:
+            del job['change_xid']
+        if 'responses' in fields and jobs:
+            await _attach_responses(db, jobs)
+    return {
+        "jobs": jobs,
+        "removed": removed.scalars().all(),
+        "watermark": encode_watermark(*watermark),
+        "has_more": has_more,
+    }
+
+async def search_jobs(db: AsyncSession, q: str, limit: int = 100, offset: int = 0, **filters):
+    """Full-text search over the GIN-indexed search_vector, best matches first."""
+    rank = func.ts_rank(Job.search_vector, _search_query(q))
+    filters['q'] = q
+    query = _apply_filters(select(Job).options(selectinload(Job.responses)), **filters)
+    query = query.order_by(rank.desc(), Job.id.desc()).limit(limit).offset(offset)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def get_facet_counts(db: AsyncSession, field: str = 'technologies', limit: int = 20, **filters):
+    """Top ``limit`` values of an array column across the filtered jobs.
+
+    Unnesting and counting happen in one aggregate query, so the client never
+    has to download jobs just to count their tags.
+    """
+    if field not in FACET_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Unknown facet field: {field}")
+    tags = _apply_filters(select(func.unnest(FACET_COLUMNS[field]).label('value')), **filters).subquery()
+    count = func.count().label('count')
+    query = select(tags.c.value, count).group_by(tags.c.value).order_by(count.desc(), tags.c.value).limit(limit)
+    result = await db.execute(query)
+    return [{"value": value, "count": n} for value, n in result.all()]
+
 async def get_job(db: AsyncSession, job_id: int):
     query = select(Job).options(selectinload(Job.responses)).where(Job.id == job_id)
     result = await db.execute(query)
@@ -59,14 +386,40 @@ async def get_job(db: AsyncSession, job_id: int):
 
     return job
 
+async def get_jobs_version(db: AsyncSession):
+    """Fingerprint of the jobs collection for conditional GETs.
+
+    Returns ``(last_modified, total, last_deleted)``: every write bumps the
+    newest ``date_modified`` or the trigger-maintained total, and deletes leave
+    a newer tombstone. All three are single index or primary-key lookups.
+    """
+    query = select(
+        select(func.max(Job.date_modified)).scalar_subquery(),
+        select(JobStat.count).where(JobStat.dimension == 'total', JobStat.value == '').scalar_subquery(),
+        select(func.max(DeletedJob.deleted_at)).scalar_subquery(),
+    )
+    result = await db.execute(query)
+    return tuple(result.one())
+
+async def get_job_version(db: AsyncSession, job_id: int):
+    """``date_modified`` of one job, without loading the row or its responses."""
+    result = await db.execute(select(Job.date_modified).where(Job.id == job_id))
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return row[0]
+
 async def create_job(db: AsyncSession, job_data):
+    # A new job has no responses yet; setting the collection up front lets it
+    # be serialized without the refresh round trip (which also left
+    # ``responses`` unloaded and failed outside the greenlet)
     job = Job(
         **job_data.dict(),
-        date_added=datetime.utcnow()
+        date_added=datetime.utcnow(),
+        responses=[]
     )
     db.add(job)
     await db.commit()
-    await db.refresh(job)
     return job
 
 async def update_job(db: AsyncSession, job_id: int, job_data):
@@ -81,6 +434,115 @@ async def update_job(db: AsyncSession, job_id: int, job_data):
     await db.refresh(job)
     return job
 
+async def bulk_create_jobs(db: AsyncSession, items):
+    """Insert many jobs in one transaction.
+
+    The executemany is sent as multi-row ``INSERT ... VALUES (...), (...)
+    RETURNING id`` batches, so a few thousand postings cost a handful of
+    round trips instead of three per row.
+    """
+    if not items:
+        return []
+    now = datetime.utcnow()
+    rows = [{**item.dict(), "date_added": now, "date_modified": now} for item in items]
+    result = await db.execute(
+        insert(Job).returning(Job.id, sort_by_parameter_order=True),
+        rows
+    )
+    ids = result.scalars().all()
+    await db.commit()
+    return [{"index": index, "id": job_id, "result": "created"} for index, job_id in enumerate(ids)]
+
+
+def _update_from_values(columns, rows, now: datetime):
+    """``UPDATE jobs SET ... FROM (VALUES ...)`` for rows of (id, *columns)."""
+    table = Job.__table__
+    data = values(
+        column('id', Integer),
+        *[column(name, table.c[name].type) for name in columns],
+        name='data'
+    ).data(rows)
+    assignments = {name: data.c[name] for name in columns}
+    assignments['date_modified'] = now
+    return update(table).where(table.c.id == data.c.id).values(assignments).returning(table.c.id)
+
+
+async def bulk_update_jobs(db: AsyncSession, items):
+    """Apply many partial updates in one transaction.
+
+    Items are merged per id (later items win) and grouped by the set of
+    fields they change; each group is a single ``UPDATE ... FROM (VALUES
+    ...)`` statement, so a homogeneous batch is one round trip.
+    """
+    changes = {}
+    for item in items:
+        changes.setdefault(item.id, {}).update(item.dict(exclude_unset=True, exclude={'id'}))
+
+    groups = {}
+    for job_id, fields in changes.items():
+        if fields:
+            groups.setdefault(tuple(sorted(fields)), []).append(job_id)
+
+    now = datetime.utcnow()
+    updated = set()
+    for columns, ids in groups.items():
+        rows = [(job_id, *[changes[job_id][name] for name in columns]) for job_id in ids]
+        result = await db.execute(_update_from_values(columns, rows, now))
+        updated.update(result.scalars().all())
+
+    # Items without any field to change still report whether the job exists
+    unchanged = [job_id for job_id, fields in changes.items() if not fields]
+    if unchanged:
+        result = await db.execute(select(Job.id).where(Job.id.in_(unchanged)))
+        updated.update(result.scalars().all())
+    await db.commit()
+
+    return [
+        {"index": index, "id": item.id, "result": "updated" if item.id in updated else "not_found"}
+        for index, item in enumerate(items)
+    ]
+
+RESCORE_CHUNK_SIZE = 5000
+
+
+async def rescore_jobs(db: AsyncSession, chunk_size: int = RESCORE_CHUNK_SIZE):
+    """Recompute score and priority for every job with the current weights.
+
+    The table is walked in id order, ``chunk_size`` rows at a time. Each chunk
+    is scored in one vectorized call and only the jobs whose score or
+    priority changed are written, in a single ``UPDATE ... FROM (VALUES ...)``
+    committed per chunk so no transaction holds locks on the whole table.
+    """
+    # Ages are scored against one clock for the whole run
+    scored_at = datetime.utcnow()
+    last_id = 0
+    processed = 0
+    updated = 0
+    query = select(
+        Job.id, Job.technologies, Job.type, Job.location, Job.status,
+        Job.date_added, Job.score, Job.priority
+    ).order_by(Job.id).limit(chunk_size)
+    while True:
+        result = await db.execute(query.where(Job.id > last_id))
+        rows = result.mappings().all()
+        if not rows:
+            break
+        scores, priorities = score_batch(rows, now=scored_at)
+        changed = [
+            (row["id"], priority, score)
+            for row, score, priority in zip(rows, scores.tolist(), priorities)
+            if row["score"] != score or row["priority"] != priority
+        ]
+        if changed:
+            # Stamped per chunk: each commit moves the jobs version, so
+            # conditional GETs and cached breakdowns see it mid-run
+            await db.execute(_update_from_values(('priority', 'score'), changed, datetime.utcnow()))
+        await db.commit()
+        processed += len(rows)
+        updated += len(changed)
+        last_id = rows[-1]["id"]
+    return {"processed": processed, "updated": updated}
+
 async def delete_job(db: AsyncSession, job_id: int):
     job = await get_job(db, job_id)
     deleted = DeletedJob(
@@ -88,6 +550,7 @@ async def delete_job(db: AsyncSession, job_id: int):
         company=job.company,
         location=job.location,
         contact_website=job.contact_website,
+        job_id=job.id,
         deleted_at=datetime.utcnow()
     )
     db.add(deleted)
@@ -102,69 +565,209 @@ async def create_job_response(db: AsyncSession, job_id: int, response_data):
         **response_data.dict()
     )
     db.add(response)
+    # Responses are part of the job representation, so its validators change
+    job.date_modified = datetime.utcnow()
     await db.commit()
     await db.refresh(response)
     return response
 
 
-async def import_jobs_from_markdown(db: AsyncSession, file_path: str = "JOBS_SOURCE.md"):
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail=f"{file_path} file not found")
+IMPORT_BATCH_SIZE = 1000
 
-    deleted_result = await db.execute(select(DeletedJob))
-    deleted_jobs = deleted_result.scalars().all()
-    deleted_signatures = {(job.title, job.company, job.location) for job in deleted_jobs}
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-    jobs_data = parse_markdown_jobs(content)
-    imported_count = 0
-    for job_data in jobs_data:
-        job_signature = (job_data["title"], job_data["company"], job_data["location"])
-        if job_signature in deleted_signatures:
-            continue
-        existing_query = select(Job).where(
-            and_(
-                Job.title == job_data["title"],
-                Job.company == job_data["company"],
-                Job.location == job_data["location"]
-            )
-        )
-        existing_job = (await db.execute(existing_query)).scalar_one_or_none()
-        if existing_job:
+def _batched(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _signature(job_data: dict):
+    return (job_data["title"], job_data["company"], job_data["location"])
+
+
+def _signature_table(signatures):
+    titles, companies, locations = (list(column) for column in zip(*signatures))
+    return func.unnest(
+        literal(titles, ARRAY(String)),
+        literal(companies, ARRAY(String)),
+        literal(locations, ARRAY(String))
+    ).table_valued('title', 'company', 'location').render_derived()
+
+
+async def _import_batch(db: AsyncSession, batch, counts: dict):
+    # Validate and drop duplicates within the batch itself
+    jobs_data = {}
+    for raw in batch:
+        try:
+            job_data = JobCreate(**raw).dict()
+        except ValidationError:
+            counts["invalid"] += 1
             continue
-        priority_result = calculate_priority(job_data)
-        job = Job(**job_data, priority=priority_result["priority"], score=priority_result["score"], date_added=datetime.utcnow())
-        db.add(job)
-        imported_count += 1
-    await db.commit()
-    return {"message": f"Successfully imported {imported_count} jobs"}
+        signature = _signature(job_data)
+        if signature in jobs_data:
+            counts["skipped"] += 1
+        else:
+            jobs_data[signature] = job_data
+    if not jobs_data:
+        return
+
+    # One round trip finds both live jobs and tombstones for the whole batch;
+    # the signatures travel as three arrays and are joined via the indexes
+    signatures = list(jobs_data)
+    batch_signatures = _signature_table(signatures)
+    existing = union_all(
+        select(literal('job').label('source'), Job.title, Job.company, Job.location)
+        .join(batch_signatures, and_(
+            Job.title == batch_signatures.c.title,
+            Job.company == batch_signatures.c.company,
+            Job.location == batch_signatures.c.location
+        )),
+        select(literal('deleted').label('source'), DeletedJob.title, DeletedJob.company, DeletedJob.location)
+        .join(batch_signatures, and_(
+            DeletedJob.title == batch_signatures.c.title,
+            DeletedJob.company == batch_signatures.c.company,
+            DeletedJob.location == batch_signatures.c.location
+        )),
+    )
+    known = {}
+    for source, title, company, location in (await db.execute(existing)).all():
+        # A tombstone wins over a live duplicate
+        if known.get((title, company, location)) != 'deleted':
+            known[(title, company, location)] = source
 
+    # Stamped as the batch is written, not when the import started
+    now = datetime.utcnow()
+    rows = []
+    for signature, job_data in jobs_data.items():
+        source = known.get(signature)
+        if source == 'deleted':
+            counts["tombstoned"] += 1
+        elif source == 'job':
+            counts["skipped"] += 1
+        else:
+            rows.append({**job_data, "date_added": now, "date_modified": now})
+    if rows:
+        scores, priorities = score_batch(rows, now=now)
+        for row, score, priority in zip(rows, scores.tolist(), priorities):
+            row["score"] = score
+            row["priority"] = priority
+        await db.execute(insert(Job.__table__), rows)
+        counts["inserted"] += len(rows)
 
-async def get_job_stats(db: AsyncSession):
-    # In-process cache
-    global _stats_cache, _stats_cache_timestamp
-    now = time.time()
-    if _stats_cache and (now - _stats_cache_timestamp) < _STATS_TTL:
-        return _stats_cache
-    # Use database aggregation for counts
-    total_query = select(func.count()).select_from(Job)
-    total_result = await db.execute(total_query)
-    total_count = total_result.scalar_one()
 
-    status_query = select(Job.status, func.count()).group_by(Job.status)
-    status_result = await db.execute(status_query)
-    status_counts = {row[0].value: row[1] for row in status_result.all()}
+async def import_jobs_from_markdown(db: AsyncSession, file_path: str = "JOBS_SOURCE.md", batch_size: int = IMPORT_BATCH_SIZE):
+    """Stream jobs from a markdown file into the database.
+
+    The file is parsed incrementally and handled ``batch_size`` jobs at a
+    time: one query per batch checks for existing jobs and tombstones by
+    (title, company, location), and one multi-row INSERT writes the rest.
+    """
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail=f"{file_path} file not found")
+
+    counts = {"inserted": 0, "skipped": 0, "tombstoned": 0, "invalid": 0}
+    with open(file_path, "r", encoding="utf-8") as f:
+        for batch in _batched(parse_markdown_jobs(f), batch_size):
+            await _import_batch(db, batch, counts)
+    await db.commit()
+    return {"message": f"Successfully imported {counts['inserted']} jobs", **counts}
 
-    priority_query = select(Job.priority, func.count()).group_by(Job.priority)
-    priority_result = await db.execute(priority_query)
-    priority_counts = {row[0].value: row[1] for row in priority_result.all()}
 
+async def get_job_stats(db: AsyncSession, dimensions=(), version=None):
+    # Counters in job_stats are kept current by triggers on jobs, so this is
+    # a read of a handful of rows instead of aggregating the jobs table;
+    # only the opt-in ``dimensions`` breakdowns touch jobs itself
+    result = await db.execute(select(JobStat.dimension, JobStat.value, JobStat.count))
     stats = {
-        "total_jobs": total_count,
-        "status_counts": status_counts,
-        "priority_counts": priority_counts
+        "total_jobs": 0,
+        "status_counts": {},
+        "priority_counts": {}
     }
-    _stats_cache = stats
-    _stats_cache_timestamp = now
+    for dimension, value, count in result.all():
+        if dimension == 'total':
+            stats["total_jobs"] = count
+        elif value and count > 0:
+            stats[f"{dimension}_counts"][value] = count
+    stats.update(await get_job_breakdowns(db, dimensions, version))
     return stats
+
+
+# Optional /api/stats breakdowns, computed together in one GROUPING SETS
+# aggregate. Constants are literal so each expression renders identically in
+# SELECT and GROUP BY.
+SCORE_BUCKET_WIDTH = 10
+STATS_DIMENSIONS = {
+    'type': Job.type,
+    'score': (func.floor(Job.score / literal_column(f"{SCORE_BUCKET_WIDTH}.0")) * literal_column(str(SCORE_BUCKET_WIDTH))).cast(Integer),
+    'weekly': func.date_trunc(literal_column("'week'"), Job.date_added),
+}
+
+# The breakdowns scan the jobs table, so each dimension set's result is kept
+# as (version, breakdowns) and reused until the jobs version moves on
+_breakdown_cache = {}
+
+def parse_stats_dimensions(dimensions: Optional[str]):
+    requested = [name.strip() for name in (dimensions or '').split(',') if name.strip()]
+    unknown = [name for name in requested if name not in STATS_DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown stats dimensions: {', '.join(unknown)}")
+    return tuple(sorted(set(requested)))
+
+
+def _format_breakdown(name: str, counts: dict):
+    if name == 'type':
+        return "type_counts", {value.value: count for value, count in counts.items() if value is not None}
+    if name == 'score':
+        return "score_histogram", [
+            {"min": bucket, "max": bucket + SCORE_BUCKET_WIDTH - 1, "count": counts[bucket]}
+            for bucket in sorted(b for b in counts if b is not None)
+        ]
+    return "weekly_added", [
+        {"week": week.date().isoformat(), "count": counts[week]}
+        for week in sorted(w for w in counts if w is not None)
+    ]
+
+
+async def _aggregate_breakdowns(db: AsyncSession, dimensions):
+    expressions = [STATS_DIMENSIONS[name] for name in dimensions]
+    query = select(
+        *[expression.label(name) for name, expression in zip(dimensions, expressions)],
+        *[func.grouping(expression).label(f"grouping_{name}") for name, expression in zip(dimensions, expressions)],
+        func.count().label("count")
+    ).group_by(func.grouping_sets(*[tuple_(expression) for expression in expressions]))
+
+    counts = {name: {} for name in dimensions}
+    for row in (await db.execute(query)).mappings():
+        # Exactly one dimension is grouped (GROUPING() = 0) in each result row
+        name = next(name for name in dimensions if row[f"grouping_{name}"] == 0)
+        counts[name][row[name]] = row["count"]
+    return dict(_format_breakdown(name, counts[name]) for name in dimensions)
+
+
+async def get_job_breakdowns(db: AsyncSession, dimensions, version=None):
+    """Requested breakdowns from a single pass over jobs, reused while the
+    jobs ``version`` is unchanged (never cached without one)."""
+    if not dimensions:
+        return {}
+    cached = _breakdown_cache.get(dimensions)
+    if version is not None and cached and cached[0] == version:
+        STATS_CACHE.inc("hit")
+        return cached[1]
+    STATS_CACHE.inc("miss")
+    breakdowns = await _aggregate_breakdowns(db, dimensions)
+    if version is not None:
+        _breakdown_cache[dimensions] = (version, breakdowns)
+    return breakdowns
+
+
+async def rebuild_job_stats(db: AsyncSession):
+    """Recount job_stats from the jobs table, e.g. after writes that bypassed
+    the triggers. Writes to jobs are blocked while the rebuild runs."""
+    await db.execute(text("SELECT job_stats_rebuild()"))
+    await db.commit()
+    return await get_job_stats(db)
@@ -0,0 +1,84 @@
+"""
+Incremental parser for the JOBS_SOURCE.md job list.
+
+Each job is a level-two heading followed by ``- **Field:** value`` bullets;
+any other non-empty lines become the description::
+
+    ## Senior Python Developer
+    - **Company:** Acme
+    - **Location:** Remote
+    - **Website:** https://acme.example/jobs/1
+    - **Type:** Full time
+    - **Technologies:** Python, FastAPI, PostgreSQL
+    Builds the ingestion pipeline.
+
+The parser consumes the file line by line and yields one job at a time, so
+memory use does not grow with the size of the source file.
+"""
+import re
+from typing import Dict, Iterable, Iterator
+
+_HEADING = re.compile(r'^##\s+(?P<title>.+?)\s*#*\s*$')
+_FIELD = re.compile(r'^[-*]\s+\*\*(?P<key>[^*]+?):?\*\*:?\s*(?P<value>.*)$')
+
+# Bullet labels (lower-cased) mapped to Job columns
+FIELD_ALIASES = {
+    'company': 'company',
+    'location': 'location',
+    'website': 'contact_website',
+    'contact': 'contact_website',
+    'url': 'contact_website',
+    'type': 'type',
+    'status': 'status',
+    'technologies': 'technologies',
+    'tech': 'technologies',
+    'stack': 'technologies',
+    'requirements': 'requirements',
+    'benefits': 'benefits',
+    'comments': 'comments',
+    'situation': 'situation',
+    'description': 'description',
+}
+
+LIST_FIELDS = {'technologies', 'requirements', 'benefits'}
+ENUM_FIELDS = {'type', 'status'}
+
+
+def _finish(job: Dict, description: list) -> Dict:
+    if description:
+        text = '\n'.join(description)
+        job['description'] = f"{job['description']}\n{text}" if job.get('description') else text
+    return job
+
+
+def parse_markdown_jobs(lines: Iterable[str]) -> Iterator[Dict]:
+    """Yield one job dict per ``##`` section of ``lines``."""
+    job = None
+    description = []
+    for line in lines:
+        line = line.strip()
+        heading = _HEADING.match(line)
+        if heading:
+            if job is not None:
+                yield _finish(job, description)
+            job, description = {'title': heading.group('title')}, []
+            continue
+        if job is None or not line:
+            continue
+
+        field = _FIELD.match(line)
+        key = FIELD_ALIASES.get(field.group('key').strip().lower()) if field else None
+        if key is None:
+            description.append(line)
+            continue
+
+        value = field.group('value').strip()
+        if key in LIST_FIELDS:
+            job[key] = [item.strip() for item in value.split(',') if item.strip()]
+        elif key in ENUM_FIELDS:
+            job[key] = re.sub(r'[\s-]+', '_', value).upper()
+        else:
+            job[key] = value
+
+    if job is not None:
+        yield _finish(job, description)
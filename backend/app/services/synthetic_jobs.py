@@ -0,0 +1,334 @@
+"""
+Synthetic job data for load testing and staging databases.
+
+generate_jobs produces jobs with realistic distributions (status, type,
+location, technology popularity, description length, response histories)
+plus the DeletedJob tombstones of jobs that were "deleted" along the way,
+chunk by chunk. seed_jobs loads the chunks with Postgres COPY over several
+asyncpg connections, committing each one, so memory stays bounded by the
+chunk size and worker count however many jobs are seeded.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+import numpy as np
+from ..db.database import engine
+from .scoring import score_batch
+
+SEED_CHUNK_SIZE = 20_000
+# Concurrent COPY connections; the row triggers run in each one's backend
+SEED_WORKERS = 4
+
+JOB_COLUMNS = (
+    'id', 'title', 'company', 'location', 'contact_website', 'description',
+    'type', 'status', 'priority', 'score', 'technologies', 'requirements',
+    'benefits', 'comments', 'situation', 'date_added', 'date_modified'
+)
+RESPONSE_COLUMNS = ('job_id', 'date', 'status', 'notes')
+TOMBSTONE_COLUMNS = ('title', 'company', 'location', 'contact_website', 'job_id', 'deleted_at')
+
+STATUS_WEIGHTS = {
+    'WISHLIST': 35, 'APPLIED': 25, 'REJECTED': 15, 'DISCARDED': 8, 'INTERVIEW': 8,
+    'IDEA': 3, 'POTENTIAL': 3, 'OFFER': 1.5, 'ACTIVE': 1, 'ALPHA': 0.25, 'PRIMARY': 0.25
+}
+TYPE_WEIGHTS = {
+    'FULL_TIME': 60, 'CONTRACT': 15, 'FREELANCE': 8, 'PART_TIME': 6,
+    'OPEN_SOURCE': 5, 'INTERNSHIP': 3, 'PROPOSAL': 3
+}
+LOCATION_WEIGHTS = {
+    'Remote': 35, 'Remote (EU)': 8, 'Remote (US)': 6, 'Berlin': 8, 'London': 8,
+    'Lisbon': 5, 'Amsterdam': 5, 'New York': 7, 'San Francisco': 6, 'São Paulo': 5,
+    'Buenos Aires': 3, 'Toronto': 4
+}
+# Most popular first; picked with Zipf-like weights
+TECHNOLOGIES = (
+    'Python', 'JavaScript', 'TypeScript', 'React', 'PostgreSQL', 'Docker', 'AWS',
+    'Node.js', 'SQL', 'Kubernetes', 'FastAPI', 'Django', 'Go', 'Java', 'Git',
+    'Linux', 'Redis', 'GraphQL', 'Terraform', 'GCP', 'Vue', 'Flask', 'Rust',
+    'Kafka', 'MongoDB', 'Azure', 'Spark', 'C#', 'Next.js', 'Pandas', 'Airflow',
+    'Elasticsearch', 'Scala', 'Ruby', 'Rails', 'Kotlin', 'Swift', 'PyTorch',
+    'TensorFlow', 'Snowflake'
+)
+REQUIREMENTS = (
+    'English', '3+ years experience', '5+ years experience', 'Degree in Computer Science',
+    'Work permit', 'Spanish', 'Portuguese', 'Team leadership', 'On-call rotation',
+    'Open source contributions'
+)
+BENEFITS = (
+    'Remote work', 'Flexible hours', 'Health insurance', 'Stock options',
+    'Learning budget', '30 days vacation', 'Home office budget', 'Parental leave'
+)
+SENIORITIES = ('Junior', '', '', 'Senior', 'Senior', 'Staff', 'Lead', 'Principal')
+ROLES = (
+    'Backend Engineer', 'Frontend Developer', 'Full Stack Developer', 'Data Engineer',
+    'Data Scientist', 'DevOps Engineer', 'Site Reliability Engineer', 'ML Engineer',
+    'Software Engineer', 'Platform Engineer', 'Mobile Developer', 'Python Developer'
+)
+COMPANY_WORDS = (
+    'Acme', 'Blue', 'Cloud', 'Data', 'Delta', 'Nova', 'Open', 'Pixel', 'Quantum',
+    'River', 'Solar', 'Stack', 'Terra', 'Vertex', 'Wave', 'Zen'
+)
+COMPANY_SUFFIXES = ('Labs', 'Systems', 'Technologies', 'Software', 'AI', 'Cloud', 'Works', 'Group')
+WORDS = (
+    'we', 'are', 'looking', 'for', 'an', 'engineer', 'to', 'join', 'our', 'team',
+    'and', 'build', 'scalable', 'services', 'with', 'the', 'product', 'you', 'will',
+    'work', 'on', 'data', 'pipelines', 'apis', 'customers', 'platform', 'design',
+    'ownership', 'remote', 'first', 'culture', 'growth', 'impact', 'modern', 'stack',
+    'collaborate', 'across', 'teams', 'ship', 'features', 'quality', 'testing'
+)
+COMMENTS = (
+    'Referral from a former colleague', 'Salary range looks good', 'Check Glassdoor reviews',
+    'Follow up next week', 'Interesting product', 'Timezone overlap is small'
+)
+# Response histories by the status they lead to
+RESPONSE_HISTORIES = {
+    'APPLIED': (('Application sent',), ('Application sent', 'Acknowledged')),
+    'INTERVIEW': (
+        ('Application sent', 'Recruiter screen'),
+        ('Application sent', 'Recruiter screen', 'Technical interview'),
+        ('Application sent', 'Recruiter screen', 'Technical interview', 'Team interview'),
+    ),
+    'OFFER': (('Application sent', 'Recruiter screen', 'Technical interview', 'Team interview', 'Offer received'),),
+    'REJECTED': (
+        ('Application sent', 'Rejected'),
+        ('Application sent', 'Recruiter screen', 'Rejected'),
+        ('Application sent', 'Recruiter screen', 'Technical interview', 'Rejected'),
+    ),
+    'ACTIVE': (('Application sent', 'Recruiter screen', 'Technical interview', 'Offer received', 'Hired'),),
+}
+
+MAX_AGE_DAYS = 730
+
+
+@dataclass
+class SyntheticChunk:
+    """COPY-ready rows, in JOB_COLUMNS, RESPONSE_COLUMNS and TOMBSTONE_COLUMNS order"""
+    jobs: List[tuple] = field(default_factory=list)
+    responses: List[tuple] = field(default_factory=list)
+    tombstones: List[tuple] = field(default_factory=list)
+
+
+def _weighted(rng, table: dict, size: int):
+    values = list(table)
+    weights = np.array([table[value] for value in values], dtype=np.float64)
+    return [values[index] for index in rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+
+def _zipf_weights(count: int, exponent: float = 1.1):
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _tags(rng, pool, size: int, mean: float, most: int, weights=None):
+    """Up to ``most`` distinct tags per row, about ``mean`` on average"""
+    counts = np.minimum(rng.poisson(mean, size), most)
+    draws = rng.choice(len(pool), size=(size, most), p=weights)
+    return [
+        [pool[index] for index in dict.fromkeys(row[:count].tolist())]
+        for row, count in zip(draws, counts.tolist())
+    ]
+
+
+def generate_jobs(
+    count: int,
+    first_id: int = 1,
+    chunk_size: int = SEED_CHUNK_SIZE,
+    tombstone_rate: float = 0.03,
+    seed: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> Iterator[SyntheticChunk]:
+    """Yield ``count`` synthetic jobs, ``chunk_size`` at a time.
+
+    Ids run from ``first_id``; about ``tombstone_rate`` of them become
+    DeletedJob tombstones instead of jobs, leaving the id gaps real deletes
+    leave. Scores and priorities come from the regular scoring rules.
+    """
+    rng = np.random.default_rng(seed)
+    now = now or datetime.utcnow()
+    technology_weights = _zipf_weights(len(TECHNOLOGIES))
+    company_count = max(10, count // 20)
+    # Many postings from a few big employers, a long tail of small ones
+    company_weights = _zipf_weights(company_count, 0.8)
+    # Descriptions are random slices of one long text
+    corpus = ' '.join(rng.choice(WORDS, size=20_000).tolist())
+
+    for start in range(0, count, chunk_size):
+        size = min(chunk_size, count - start)
+        ids = range(first_id + start, first_id + start + size)
+        chunk = SyntheticChunk()
+
+        statuses = _weighted(rng, STATUS_WEIGHTS, size)
+        types = _weighted(rng, TYPE_WEIGHTS, size)
+        locations = _weighted(rng, LOCATION_WEIGHTS, size)
+        technologies = _tags(rng, TECHNOLOGIES, size, 3.5, 8, technology_weights)
+        requirements = _tags(rng, REQUIREMENTS, size, 2, 4)
+        benefits = _tags(rng, BENEFITS, size, 2.5, 5)
+        companies = rng.choice(company_count, size=size, p=company_weights).tolist()
+        titles = zip(rng.integers(len(SENIORITIES), size=size).tolist(), rng.integers(len(ROLES), size=size).tolist())
+        # Recent postings are the most common
+        ages = np.minimum(rng.exponential(120, size), MAX_AGE_DAYS)
+        added = [now - timedelta(days=age) for age in ages.tolist()]
+        touched = rng.random(size).tolist()
+        description_lengths = np.clip(rng.lognormal(6.5, 0.6, size), 80, 8000).astype(int).tolist()
+        description_starts = rng.integers(0, len(corpus) - 8000, size=size).tolist()
+        commented = (rng.random(size) < 0.2).tolist()
+        comment_picks = rng.integers(len(COMMENTS), size=size).tolist()
+        deleted = (rng.random(size) < tombstone_rate).tolist()
+        history_picks = rng.integers(0, 1 << 30, size=size).tolist()
+        response_gaps = rng.exponential(4, size=(size, 5)).tolist()
+
+        jobs = []
+        for index, job_id in enumerate(ids):
+            company_index = companies[index]
+            company = (
+                f"{COMPANY_WORDS[company_index % len(COMPANY_WORDS)]} "
+                f"{COMPANY_WORDS[company_index // len(COMPANY_WORDS) % len(COMPANY_WORDS)]} "
+                f"{COMPANY_SUFFIXES[company_index % len(COMPANY_SUFFIXES)]}"
+                + (f" {company_index}" if company_index >= 256 else "")
+            )
+            seniority, role = next(titles)
+            title = f"{SENIORITIES[seniority]} {ROLES[role]}".strip()
+            website = f"https://careers.{company.split()[0].lower()}.example/jobs/{job_id}"
+            date_added = added[index]
+            if deleted[index]:
+                deleted_at = date_added + (now - date_added) * touched[index]
+                chunk.tombstones.append((title, company, locations[index], website, job_id, deleted_at))
+                continue
+
+            status = statuses[index]
+            description_start = corpus.index(' ', description_starts[index]) + 1
+            description = corpus[description_start:description_start + description_lengths[index]].capitalize() + '.'
+            comment = COMMENTS[comment_picks[index]] if commented[index] else None
+            histories = RESPONSE_HISTORIES.get(status, ((),))
+            situation = None
+            response_date = date_added
+            for step, situation in enumerate(histories[history_picks[index] % len(histories)]):
+                response_date = min(now, response_date + timedelta(days=response_gaps[index][step]))
+                chunk.responses.append((job_id, response_date, situation, None))
+            date_modified = max(response_date, date_added + (now - date_added) * touched[index])
+            jobs.append({
+                'id': job_id, 'title': title, 'company': company, 'location': locations[index],
+                'contact_website': website, 'description': description, 'type': types[index],
+                'status': status, 'technologies': technologies[index],
+                'requirements': requirements[index], 'benefits': benefits[index],
+                'comments': comment, 'situation': situation, 'date_added': date_added,
+                'date_modified': date_modified,
+            })
+
+        scores, priorities = score_batch(jobs, now=now)
+        for job, score, priority in zip(jobs, scores.tolist(), priorities):
+            job['score'] = score
+            job['priority'] = priority.value
+            chunk.jobs.append(tuple(job.get(name) for name in JOB_COLUMNS))
+        yield chunk
+
+
+async def _secondary_indexes(conn):
+    """``(name, definition)`` of the jobs indexes that back no constraint"""
+    rows = await conn.fetch(
+        "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE i.indrelid = 'jobs'::regclass AND NOT i.indisprimary AND NOT i.indisunique"
+    )
+    return [tuple(row) for row in rows]
+
+
+async def _copy_chunk(chunk: SyntheticChunk):
+    async with engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        async with raw.transaction():
+            # Losing the last chunks in a crash is fine for generated data
+            await raw.execute("SET LOCAL synchronous_commit = off")
+            if chunk.jobs:
+                await raw.copy_records_to_table('jobs', records=chunk.jobs, columns=JOB_COLUMNS)
+            if chunk.responses:
+                await raw.copy_records_to_table('job_responses', records=chunk.responses, columns=RESPONSE_COLUMNS)
+            if chunk.tombstones:
+                await raw.copy_records_to_table('deleted_jobs', records=chunk.tombstones, columns=TOMBSTONE_COLUMNS)
+
+
+async def _create_indexes(definitions, workers: int):
+    pending = list(definitions)
+
+    async def build():
+        async with engine.connect() as conn:
+            raw = (await conn.get_raw_connection()).driver_connection
+            while pending:
+                await raw.execute(pending.pop())
+
+    await asyncio.gather(*(build() for _ in range(min(workers, len(pending)))))
+
+
+async def seed_jobs(
+    count: int,
+    chunk_size: int = SEED_CHUNK_SIZE,
+    tombstone_rate: float = 0.03,
+    seed: Optional[int] = None,
+    workers: int = SEED_WORKERS,
+    progress=None,
+):
+    """COPY ``count`` synthetic jobs (see generate_jobs) into the database.
+
+    New ids follow the highest job id ever used and are reserved on the id
+    sequence up front, so seeding can add to an existing database. Chunks
+    are generated in a thread while ``workers`` connections COPY earlier
+    ones, each in its own transaction; ``progress(seeded, count)`` is
+    called as they commit.
+
+    Into an empty jobs table, the secondary indexes are dropped for the
+    load and rebuilt from scratch afterwards, which is much faster than
+    updating them row by row.
+    """
+    async with engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        first_id = 1 + await raw.fetchval(
+            "SELECT greatest("
+            "(SELECT coalesce(max(id), 0) FROM jobs), "
+            "(SELECT coalesce(max(job_id), 0) FROM deleted_jobs), "
+            "(SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM jobs_id_seq))"
+        )
+        if count > 0:
+            await raw.execute("SELECT setval('jobs_id_seq', $1)", first_id + count - 1)
+        indexes = []
+        if not await raw.fetchval("SELECT EXISTS (SELECT 1 FROM jobs)"):
+            indexes = await _secondary_indexes(raw)
+            for name, _ in indexes:
+                await raw.execute(f'DROP INDEX "{name}"')
+
+    totals = {"jobs": 0, "responses": 0, "tombstones": 0}
+    seeded = 0
+    chunks = generate_jobs(count, first_id, chunk_size, tombstone_rate, seed)
+    queue = asyncio.Queue(maxsize=workers)
+
+    async def produce():
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            await queue.put(chunk)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def consume():
+        nonlocal seeded
+        while (chunk := await queue.get()) is not None:
+            await _copy_chunk(chunk)
+            totals["jobs"] += len(chunk.jobs)
+            totals["responses"] += len(chunk.responses)
+            totals["tombstones"] += len(chunk.tombstones)
+            seeded += len(chunk.jobs) + len(chunk.tombstones)
+            if progress is not None:
+                progress(seeded, count)
+
+    tasks = [asyncio.create_task(produce())] + [asyncio.create_task(consume()) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Rebuilt even after a failed load, so the app never runs without them
+        await _create_indexes([definition for _, definition in indexes], workers)
+
+    async with engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        await raw.execute("ANALYZE jobs, job_responses, deleted_jobs")
+    return totals
@@ -0,0 +1,47 @@
+"""
+Shared fixtures.
+
+Unit tests need nothing but the requirements. Tests that talk to Postgres
+use the ``api`` fixture and run only when TEST_DATABASE_URL points at a
+scratch database: its job tables are emptied before every test.
+"""
+import os
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    # Before app is imported: the engines are created at import time
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ.setdefault("DB_ECHO", "false")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def api():
+    """An HTTP client for the app, backed by an empty scratch database"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    import httpx
+    from sqlalchemy import text
+
+    from app.db import database
+    from app.main import app
+    from app.services import job_service
+
+    await database.init_db()
+    async with database.engine.begin() as conn:
+        await conn.execute(text("TRUNCATE job_responses, jobs, deleted_jobs RESTART IDENTITY CASCADE"))
+        await conn.execute(text("SELECT job_stats_rebuild()"))
+    job_service._breakdown_cache.clear()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        # Pooled connections belong to this test's event loop
+        await database.engine.dispose()
@@ -0,0 +1,98 @@
+"""Conditional GET validators and content negotiation"""
+from datetime import datetime
+
+import pytest
+from starlette.requests import Request
+
+from app.core import conditional
+from app.core.negotiation import JSON, MSGPACK, choose_encoding, choose_media_type
+
+VALIDATORS = conditional.validators(datetime(2025, 3, 1, 12, 0), 10, last_modified=datetime(2025, 3, 1, 12, 0, 30, 500))
+
+
+def request_with(**headers):
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_validators_depend_on_version_only():
+    assert VALIDATORS == conditional.validators(datetime(2025, 3, 1, 12, 0), 10, last_modified=datetime(2025, 3, 1, 12, 0, 30))
+    assert VALIDATORS["ETag"] != conditional.validators(datetime(2025, 3, 1, 12, 0), 11)["ETag"]
+    assert VALIDATORS["ETag"].startswith('W/"')
+    assert VALIDATORS["Last-Modified"] == "Sat, 01 Mar 2025 12:00:30 GMT"
+
+
+def test_last_modified_waits_for_its_second_to_end(monkeypatch):
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2025, 3, 1, 12, 0, 30, 900000, tzinfo=tz)
+
+    monkeypatch.setattr(conditional, "datetime", Clock)
+    headers = conditional.validators(1, last_modified=datetime(2025, 3, 1, 12, 0, 30, 100000))
+    assert "Last-Modified" not in headers
+    assert not conditional.is_not_modified(request_with(if_modified_since="Sat, 01 Mar 2025 12:00:30 GMT"), headers)
+
+    headers = conditional.validators(1, last_modified=datetime(2025, 3, 1, 12, 0, 29, 999999))
+    assert headers["Last-Modified"] == "Sat, 01 Mar 2025 12:00:29 GMT"
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (VALIDATORS["ETag"], True),
+    (VALIDATORS["ETag"].removeprefix("W/"), True),
+    (f'"other", {VALIDATORS["ETag"]}', True),
+    ("*", True),
+    ('W/"other"', False),
+])
+def test_if_none_match(if_none_match, expected):
+    assert conditional.is_not_modified(request_with(if_none_match=if_none_match), VALIDATORS) is expected
+
+
+@pytest.mark.parametrize("if_modified_since, expected", [
+    ("Sat, 01 Mar 2025 12:00:30 GMT", True),
+    ("Sat, 01 Mar 2025 13:00:00 GMT", True),
+    ("Sat, 01 Mar 2025 12:00:29 GMT", False),
+    ("yesterday", False),
+])
+def test_if_modified_since(if_modified_since, expected):
+    assert conditional.is_not_modified(request_with(if_modified_since=if_modified_since), VALIDATORS) is expected
+
+
+def test_if_none_match_takes_precedence():
+    request = request_with(if_none_match='W/"other"', if_modified_since="Sat, 01 Mar 2025 13:00:00 GMT")
+    assert not conditional.is_not_modified(request, VALIDATORS)
+
+
+def test_latest_ignores_missing():
+    assert conditional.latest(None, datetime(2025, 1, 2), datetime(2025, 1, 1)) == datetime(2025, 1, 2)
+    assert conditional.latest(None, None) is None
+
+
+OFFERED = (JSON, MSGPACK)
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("", JSON),
+    ("*/*", JSON),
+    (MSGPACK, MSGPACK),
+    ("application/x-msgpack", MSGPACK),
+    ("application/msgpack;q=0.5, application/json;q=0.9", JSON),
+    ("application/*;q=0.2, application/msgpack", MSGPACK),
+    ("text/html", JSON),
+])
+def test_choose_media_type(accept, expected):
+    assert choose_media_type(accept, OFFERED) == expected
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("", None),
+    ("gzip, br", "br"),
+    ("gzip;q=1, br;q=0.5", "gzip"),
+    ("*", "br"),
+    ("br;q=0, *", "gzip"),
+    ("identity", None),
+])
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding, ("br", "gzip")) == expected
@@ -0,0 +1,42 @@
+"""Merging a bulk CSV/NDJSON import into the stored jobs"""
+import json
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def ndjson(*jobs):
+    return "".join(json.dumps(job) + "\n" for job in jobs)
+
+
+def job(title):
+    return {"title": title, "company": "Acme", "location": "Remote"}
+
+
+async def test_import_counts(api):
+    assert (await api.post("/api/jobs/bulk", json=[job("Stored"), job("Deleted")])).status_code == 200
+    assert (await api.delete("/api/jobs/2")).status_code == 200
+
+    body = ndjson(job("New"), job("Stored"), job("Deleted"), job("New"), {"title": "No company"}, job("Other"))
+    response = await api.post("/api/jobs/import", params={"format": "ndjson"}, content=body)
+    assert response.status_code == 200
+    result = response.json()
+    assert {key: result[key] for key in ("received", "inserted", "skipped", "tombstoned", "invalid")} == {
+        "received": 6, "inserted": 2, "skipped": 2, "tombstoned": 1, "invalid": 1
+    }
+    assert [error["record"] for error in result["errors"]] == [5]
+
+    titles = [item["title"] for item in (await api.get("/api/jobs", params={"sort_by": "id", "sort_order": "asc"})).json()]
+    assert titles == ["Stored", "New", "Other"]
+
+
+async def test_csv_import_skips_repeated_tombstones_once(api):
+    assert (await api.post("/api/jobs/bulk", json=[job("Deleted")])).status_code == 200
+    assert (await api.delete("/api/jobs/1")).status_code == 200
+
+    body = "title,company,location\nDeleted,Acme,Remote\nDeleted,Acme,Remote\nKept,Acme,Remote\n"
+    response = await api.post("/api/jobs/import", content=body, headers={"Content-Type": "text/csv"})
+    result = response.json()
+    # Both copies are left out, one signature is counted as tombstoned
+    assert (result["inserted"], result["skipped"], result["tombstoned"]) == (1, 1, 1)
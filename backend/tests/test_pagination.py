@@ -0,0 +1,68 @@
+"""Opaque positions handed to clients: list cursors and change-feed watermarks"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.job import Priority
+from app.services.job_service import decode_cursor, decode_watermark, encode_cursor, encode_watermark, next_cursor
+
+
+def make_job(**values):
+    return SimpleNamespace(**{"id": 7, "date_added": datetime(2025, 3, 1, 12, 30), "priority": Priority.HIGH, **values})
+
+
+@pytest.mark.parametrize("sort_by, expected", [
+    ("date_added", datetime(2025, 3, 1, 12, 30)),
+    ("priority", Priority.HIGH),
+])
+def test_cursor_round_trip(sort_by, expected):
+    cursor = encode_cursor(make_job(), sort_by, "desc")
+    assert "=" not in cursor
+    assert decode_cursor(cursor, sort_by, "desc") == (expected, 7)
+
+
+def test_cursor_with_null_value():
+    cursor = encode_cursor(make_job(id=3, company=None), "company", "asc")
+    assert decode_cursor(cursor, "company", "asc") == (None, 3)
+
+
+def test_cursor_of_sparse_row():
+    cursor = encode_cursor({"id": 3, "company": "Acme"}, "company", "asc")
+    assert decode_cursor(cursor, "company", "asc") == ("Acme", 3)
+
+
+@pytest.mark.parametrize("cursor, sort_order", [
+    (encode_cursor(make_job(), "date_added", "desc"), "asc"),
+    ("not a cursor", "desc"),
+    ("", "desc"),
+])
+def test_invalid_cursor(cursor, sort_order):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor, "date_added", sort_order)
+    assert excinfo.value.status_code == 400
+
+
+def test_next_cursor_only_after_full_page():
+    jobs = [make_job(id=job_id) for job_id in (9, 8)]
+    assert next_cursor(jobs, "date_added", "desc", limit=3) is None
+    assert next_cursor([], "date_added", "desc", limit=3) is None
+    assert decode_cursor(next_cursor(jobs, "date_added", "desc", limit=2), "date_added", "desc")[1] == 8
+
+
+def test_next_cursor_normalizes_ordering():
+    cursor = next_cursor([make_job()], "unknown", "sideways", limit=1)
+    assert decode_cursor(cursor, "date_added", "asc")[1] == 7
+
+
+def test_watermark_round_trip():
+    assert decode_watermark(encode_watermark(1200, 42, [1190, 1185])) == (1200, 42, [1185, 1190])
+    assert decode_watermark(encode_watermark(1200)) == (1200, 0, [])
+
+
+@pytest.mark.parametrize("watermark", ["garbage", encode_cursor(make_job(), "date_added", "desc"), ""])
+def test_invalid_watermark(watermark):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_watermark(watermark)
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,154 @@
+"""The markdown job list and the CSV/NDJSON line formats"""
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.job_formats import csv_lines, decode_list, encode_list, ndjson_lines
+from app.services.job_ingest import _csv_records, _ndjson_records
+from app.services.markdown_parser import parse_markdown_jobs
+
+MARKDOWN = """\
+# Jobs
+
+Intro text before the first job is ignored.
+
+## Senior Python Developer ##
+- **Company:** Acme
+- **Location:** Remote
+- **Website:** https://acme.example/jobs/1
+- **Type:** Full-time
+- **Tech:** Python, FastAPI, , PostgreSQL
+Builds the ingestion pipeline.
+- **Unknown:** kept in the description
+
+## Data Engineer
+* **Company**: Initech
+- **Status:** interview
+"""
+
+
+def test_parse_markdown_jobs():
+    jobs = list(parse_markdown_jobs(io.StringIO(MARKDOWN)))
+    assert jobs == [
+        {
+            "title": "Senior Python Developer",
+            "company": "Acme",
+            "location": "Remote",
+            "contact_website": "https://acme.example/jobs/1",
+            "type": "FULL_TIME",
+            "technologies": ["Python", "FastAPI", "PostgreSQL"],
+            "description": "Builds the ingestion pipeline.\n- **Unknown:** kept in the description",
+        },
+        {"title": "Data Engineer", "company": "Initech", "status": "INTERVIEW"},
+    ]
+
+
+def test_parse_markdown_is_lazy():
+    def lines():
+        yield "## First"
+        yield "## Second"
+        raise AssertionError("read past the second job")
+
+    assert next(parse_markdown_jobs(lines())) == {"title": "First"}
+
+
+@pytest.mark.parametrize("items", [
+    [],
+    ["python"],
+    ["C|C++", "back\\slash", "", "trailing\\"],
+    ["|", "\\|", "a|b|c"],
+])
+def test_list_cell_round_trip(items):
+    assert decode_list(encode_list(items)) == items
+
+
+def test_decode_list_without_escapes():
+    assert decode_list("a|b||c") == ["a", "b", "", "c"]
+    assert decode_list("") == []
+
+
+async def chunks(*batches):
+    for batch in batches:
+        yield batch
+
+
+async def collect(lines):
+    return b"".join([block async for block in lines]).decode()
+
+
+JOB_ROWS = [
+    {"id": 1, "title": "A", "technologies": ["x|y"], "date_added": datetime(2025, 1, 2, 3, 4), "response_status": "APPLIED", "response_notes": None},
+    {"id": 1, "title": "A", "technologies": ["x|y"], "date_added": datetime(2025, 1, 2, 3, 4), "response_status": "INTERVIEW", "response_notes": "Call"},
+    {"id": 2, "title": "B", "technologies": [], "date_added": None, "response_status": None, "response_notes": None},
+]
+COLUMNS = ("id", "title", "technologies", "date_added")
+RESPONSE_COLUMNS = ("response_status", "response_notes")
+
+
+@pytest.mark.anyio
+async def test_ndjson_folds_responses_across_chunks():
+    text = await collect(ndjson_lines(chunks(JOB_ROWS[:1], JOB_ROWS[1:]), COLUMNS, RESPONSE_COLUMNS))
+    jobs = [json.loads(line) for line in text.splitlines()]
+    assert jobs == [
+        {"id": 1, "title": "A", "technologies": ["x|y"], "date_added": "2025-01-02T03:04:00",
+         "responses": [{"status": "APPLIED", "notes": None}, {"status": "INTERVIEW", "notes": "Call"}]},
+        {"id": 2, "title": "B", "technologies": [], "date_added": None, "responses": []},
+    ]
+
+
+@pytest.mark.anyio
+async def test_csv_rows():
+    text = await collect(csv_lines(chunks(JOB_ROWS[2:]), COLUMNS))
+    assert list(csv.reader(io.StringIO(text))) == [list(COLUMNS), ["2", "B", "", ""]]
+
+    text = await collect(csv_lines(chunks(JOB_ROWS[:1]), COLUMNS, RESPONSE_COLUMNS))
+    header, row = list(csv.reader(io.StringIO(text)))
+    assert row == ["1", "A", "x\\|y", "2025-01-02T03:04:00", "APPLIED", ""]
+    assert decode_list(row[2]) == ["x|y"]
+
+
+async def records(parsed):
+    return [record async for record in parsed]
+
+
+@pytest.mark.anyio
+async def test_csv_records_across_chunks():
+    # BOM split between chunks, and a quoted newline that ends a chunk
+    body = '\ufefftitle,company,description,technologies,extra\r\nA,Acme,"two\nlines",x\\|y|z,ignored\r\nB,Acme,,,\r\n'.encode()
+    cut = body.index(b"two\n") + 4
+    parsed = await records(_csv_records(chunks(body[:2], body[2:cut], body[cut:])))
+    assert parsed == [
+        (1, {"title": "A", "company": "Acme", "description": "two\nlines", "technologies": ["x|y", "z"]}, None),
+        (2, {"title": "B", "company": "Acme", "technologies": []}, None),
+    ]
+
+
+@pytest.mark.anyio
+async def test_csv_records_with_the_wrong_field_count():
+    parsed = await records(_csv_records(chunks(b"title,company\nA\n\nB,Acme\n")))
+    assert parsed == [
+        (1, None, "expected 2 fields, found 1"),
+        (2, {"title": "B", "company": "Acme"}, None),
+    ]
+
+
+@pytest.mark.anyio
+async def test_ndjson_records_across_chunks():
+    # A record split between chunks, and a line separator (U+2028) that
+    # does not end one
+    parsed = await records(_ndjson_records(chunks(b'{"title": "A"}\n\n{"tit', b'le": "B\xe2\x80\xa8"}\nnot json\n[1]')))
+    assert [(number, record) for number, record, _ in parsed] == [
+        (1, {"title": "A"}), (3, {"title": "B\u2028"}), (4, None), (5, [1])
+    ]
+    assert parsed[2][2].startswith("invalid JSON")
+
+
+@pytest.mark.anyio
+async def test_records_reject_invalid_utf8():
+    with pytest.raises(HTTPException) as error:
+        await records(_ndjson_records(chunks(b'{"title": "\xff"}\n')))
+    assert error.value.status_code == 400
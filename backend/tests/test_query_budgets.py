@@ -0,0 +1,125 @@
+"""
+Statement budgets for the hot paths (see app.core.query_tracker).
+
+The markdown import is budgeted without a database: a stand-in session
+records each statement the way the engine hooks do. The endpoint budgets
+run the API against TEST_DATABASE_URL, on enough jobs to fill several
+pages, so a per-row query would show up as a repeated statement shape.
+"""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.query_tracker import query_budget, record
+from app.db.database import async_session
+from app.schemas.job import JobResponseCreate
+from app.services import job_service
+
+pytestmark = pytest.mark.anyio
+
+JOBS = 30
+
+
+class RecordingSession:
+    """Just enough of AsyncSession for write paths that only execute statements"""
+
+    async def execute(self, statement, params=None):
+        record(str(statement.compile(dialect=postgresql.dialect())), 0.0)
+        return RecordingResult()
+
+    async def commit(self):
+        pass
+
+
+class RecordingResult:
+    def all(self):
+        return []
+
+
+async def test_markdown_import(tmp_path):
+    source = tmp_path / "JOBS_SOURCE.md"
+    source.write_text("".join(f"## Job {i}\n- **Company:** Acme\n- **Location:** Remote\n" for i in range(120)))
+    # Two batches: one lookup and one INSERT each, however many jobs
+    with query_budget(4):
+        result = await job_service.import_jobs_from_markdown(RecordingSession(), str(source), batch_size=100)
+    assert result["inserted"] == 120
+
+
+@pytest.fixture
+async def seeded(api):
+    jobs = [
+        {"title": f"Job {i}", "company": f"Company {i % 3}", "location": "Remote", "technologies": ["python"]}
+        for i in range(JOBS)
+    ]
+    response = await api.post("/api/jobs/bulk", json=jobs)
+    assert response.status_code == 200
+    async with async_session() as db:
+        for job_id in (1, 2, 3):
+            await job_service.create_job_response(db, job_id, JobResponseCreate(status="APPLIED"))
+    return api
+
+
+async def test_job_list(seeded):
+    with query_budget(3):
+        response = await seeded.get("/api/jobs", params={"limit": 10})
+    assert response.status_code == 200
+    assert len(response.json()) == 10
+
+    with query_budget(3):
+        response = await seeded.get("/api/jobs", params={"limit": 10, "cursor": response.headers["X-Next-Cursor"]})
+    assert response.status_code == 200
+    assert len(response.json()) == 10
+
+
+async def test_fresh_job_page(seeded):
+    # Watermark, version, page
+    with query_budget(3):
+        response = await seeded.get("/api/jobs", params={"limit": 10, "view": "summary", "fresh": "true"})
+    assert len(response.json()) == 10
+    watermark = response.headers["X-Changes-Watermark"]
+
+    await seeded.patch("/api/jobs/5", json={"title": "Renamed"})
+    changes = (await seeded.get("/api/jobs/changes", params={"since": watermark})).json()
+    assert [job["title"] for job in changes["jobs"]] == ["Renamed"]
+
+
+async def test_job_list_sparse_fields(seeded):
+    with query_budget(3):
+        response = await seeded.get("/api/jobs", params={"fields": "title,responses"})
+    assert response.status_code == 200
+    assert len(response.json()) == JOBS
+
+
+async def test_job_list_not_modified(seeded):
+    etag = (await seeded.get("/api/jobs")).headers["ETag"]
+    with query_budget(1):
+        response = await seeded.get("/api/jobs", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+async def test_job_changes(seeded):
+    with query_budget(1):
+        response = await seeded.get("/api/jobs/changes")
+    watermark = response.json()["watermark"]
+
+    await seeded.patch("/api/jobs/5", json={"title": "Renamed"})
+    await seeded.delete("/api/jobs/6")
+    # Snapshot, changed jobs, their responses, tombstones
+    with query_budget(4):
+        response = await seeded.get("/api/jobs/changes", params={"since": watermark})
+    changes = response.json()
+    assert [job["title"] for job in changes["jobs"]] == ["Renamed"]
+    assert changes["removed"] == [6]
+
+
+async def test_stats(seeded):
+    with query_budget(2):
+        response = await seeded.get("/api/stats")
+    assert response.json()["total_jobs"] == JOBS
+
+    with query_budget(3):
+        response = await seeded.get("/api/stats", params={"dimensions": "type,score,weekly"})
+    assert response.json()["type_counts"] == {"FULL_TIME": JOBS}
+
+    # Cached until the jobs change
+    with query_budget(2):
+        await seeded.get("/api/stats", params={"dimensions": "type,score,weekly"})
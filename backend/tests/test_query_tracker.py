@@ -0,0 +1,61 @@
+"""Statement shapes, query logs and budgets"""
+import pytest
+
+from app.core.query_tracker import QueryBudgetExceeded, query_budget, record, statement_shape, track_queries
+
+
+@pytest.mark.parametrize("statement, shape", [
+    ("SELECT * FROM jobs WHERE id = $1", "SELECT * FROM jobs WHERE id = ?"),
+    ("SELECT *\n  FROM jobs  WHERE title = 'it''s' LIMIT 10", "SELECT * FROM jobs WHERE title = ? LIMIT ?"),
+    ("SELECT * FROM jobs WHERE id IN ($1::INTEGER, $2::INTEGER, $3::INTEGER)", "SELECT * FROM jobs WHERE id IN (?, ...)"),
+    ("INSERT INTO t (a) VALUES (%(a_1)s, %(a_2)s)", "INSERT INTO t (a) VALUES (?, ...)"),
+])
+def test_statement_shape(statement, shape):
+    assert statement_shape(statement) == shape
+
+
+def test_in_lists_of_any_length_share_a_shape():
+    assert statement_shape("SELECT 1 WHERE id IN ($1, $2)") == statement_shape("SELECT 1 WHERE id IN ($1, $2, $3, $4)")
+
+
+def test_nested_logs_both_record():
+    with track_queries() as outer:
+        record("SELECT 1", 0.5)
+        with track_queries() as inner:
+            record("SELECT 2", 0.25)
+    record("SELECT 3", 1.0)
+    assert (outer.count, outer.seconds) == (2, 0.75)
+    assert inner.count == 1
+
+
+def test_repeated_shapes():
+    with track_queries() as log:
+        for job_id in range(3):
+            record(f"SELECT * FROM job_responses WHERE job_id = {job_id}", 0.0)
+        record("SELECT * FROM jobs", 0.0)
+    assert log.repeated() == {"SELECT * FROM job_responses WHERE job_id = ?": 3}
+    assert "3x SELECT * FROM job_responses" in log.summary()
+
+
+def test_budget_within_limits():
+    with query_budget(2, max_seconds=1.0):
+        record("SELECT 1", 0.1)
+        record("SELECT 2", 0.1)
+
+
+@pytest.mark.parametrize("budget, message", [
+    ({"max_statements": 2}, "3 statements, budget 2"),
+    ({"max_statements": 5, "max_seconds": 0.1}, "in the database, budget 0.1s"),
+    ({"max_statements": 5}, "probable N+1"),
+])
+def test_budget_exceeded(budget, message):
+    with pytest.raises(QueryBudgetExceeded, match=message.replace("+", r"\+")):
+        with query_budget(**budget):
+            for job_id in range(3):
+                record(f"SELECT * FROM jobs WHERE id = {job_id}", 0.05)
+
+
+def test_budget_allowing_repeats():
+    with query_budget(3, allow_repeats=True):
+        for job_id in range(3):
+            record(f"SELECT * FROM jobs WHERE id = {job_id}", 0.0)
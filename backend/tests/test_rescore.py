@@ -0,0 +1,32 @@
+"""Rescoring the whole table in committed chunks"""
+import pytest
+from sqlalchemy import func, select, update
+
+from app.db.database import async_session
+from app.models.job import Job
+from app.services import job_service
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_each_chunk_moves_the_jobs_version(api, monkeypatch):
+    jobs = [{"title": f"Job {i}", "company": "Acme", "location": "Remote"} for i in range(25)]
+    assert (await api.post("/api/jobs/bulk", json=jobs)).status_code == 200
+    async with async_session() as db:
+        await db.execute(update(Job).values(score=-1))
+        await db.commit()
+
+        stamps = []
+        update_chunk = job_service._update_from_values
+
+        def recording(columns, rows, now):
+            stamps.append(now)
+            return update_chunk(columns, rows, now)
+
+        monkeypatch.setattr(job_service, "_update_from_values", recording)
+        result = await job_service.rescore_jobs(db, chunk_size=10)
+
+        assert result == {"processed": 25, "updated": 25}
+        assert len(stamps) == 3 and stamps == sorted(set(stamps))
+        stored = await db.execute(select(func.count(func.distinct(Job.date_modified))))
+        assert stored.scalar_one() == 3
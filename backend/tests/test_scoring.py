@@ -0,0 +1,44 @@
+"""Batch priority scoring"""
+from datetime import datetime, timedelta
+
+from app.models.job import JobStatus, JobType, Priority
+from app.services.scoring import ScoringWeights, calculate_priority, score_batch
+
+NOW = datetime(2025, 3, 1)
+WEIGHTS = ScoringWeights(preferred_technologies=frozenset({"python", "rust"}), preferred_locations=("remote",))
+
+
+def test_score_components():
+    jobs = [
+        # 2 technologies (20) + location (15) + full time (10) + interview (15)
+        {"technologies": ["Python", "Rust", "Go"], "location": "Remote (EU)", "type": "FULL_TIME", "status": "INTERVIEW", "date_added": NOW},
+        # Unknown type and status score nothing; 3 weeks old loses 3
+        {"technologies": [], "location": "Berlin", "type": "OTHER", "status": None, "date_added": NOW - timedelta(weeks=3)},
+        # Enum members score like their values; the age penalty is capped
+        {"technologies": None, "location": None, "type": JobType.CONTRACT, "status": JobStatus.REJECTED, "date_added": NOW - timedelta(weeks=100)},
+    ]
+    scores, priorities = score_batch(jobs, WEIGHTS, now=NOW)
+    assert scores.tolist() == [60, -3, 8 - 30 - 20]
+    assert priorities == [Priority.HIGH, Priority.LOW, Priority.LOW]
+
+
+def test_priority_thresholds():
+    jobs = [{"technologies": ["python"] * count, "type": None, "status": None, "date_added": NOW} for count in (4, 3, 2, 1)]
+    scores, priorities = score_batch(jobs, WEIGHTS, now=NOW)
+    assert scores.tolist() == [40, 30, 20, 10]
+    assert priorities == [Priority.HIGH, Priority.MEDIUM, Priority.MEDIUM, Priority.LOW]
+
+
+def test_batch_matches_single_scoring():
+    jobs = [
+        {"technologies": ["rust"], "location": "remote", "type": "FREELANCE", "status": "APPLIED"},
+        {"technologies": ["python", "python"], "location": "office", "type": "INTERNSHIP", "status": "OFFER"},
+    ]
+    scores, priorities = score_batch(jobs, WEIGHTS)
+    for job, score, priority in zip(jobs, scores.tolist(), priorities):
+        assert calculate_priority(job, WEIGHTS) == {"priority": priority, "score": score}
+
+
+def test_empty_batch():
+    scores, priorities = score_batch([], WEIGHTS)
+    assert scores.size == 0 and priorities == []
@@ -0,0 +1,59 @@
+"""Reuse of the /api/stats breakdowns across requests"""
+import pytest
+from fastapi import HTTPException
+
+from app.services import job_service
+
+pytestmark = pytest.mark.anyio
+
+VERSION = ("2025-03-01T12:00:00", 10, None)
+
+
+@pytest.fixture
+def aggregations(monkeypatch):
+    """Dimension sets aggregated, in order, instead of querying the jobs table"""
+    calls = []
+
+    async def aggregate(db, dimensions):
+        calls.append(dimensions)
+        return {"type_counts": {"FULL_TIME": len(calls)}}
+
+    monkeypatch.setattr(job_service, "_aggregate_breakdowns", aggregate)
+    monkeypatch.setattr(job_service, "_breakdown_cache", {})
+    return calls
+
+
+async def test_reused_while_version_unchanged(aggregations):
+    first = await job_service.get_job_breakdowns(None, ("type",), VERSION)
+    second = await job_service.get_job_breakdowns(None, ("type",), VERSION)
+    assert first is second
+    assert aggregations == [("type",)]
+
+
+async def test_recomputed_once_version_moves_on(aggregations):
+    await job_service.get_job_breakdowns(None, ("type",), VERSION)
+    newer = ("2025-03-01T12:00:01", 11, None)
+    breakdowns = await job_service.get_job_breakdowns(None, ("type",), newer)
+    assert breakdowns == {"type_counts": {"FULL_TIME": 2}}
+    assert await job_service.get_job_breakdowns(None, ("type",), newer) is breakdowns
+
+
+async def test_cached_per_dimension_set(aggregations):
+    await job_service.get_job_breakdowns(None, ("type",), VERSION)
+    await job_service.get_job_breakdowns(None, ("score", "type"), VERSION)
+    assert aggregations == [("type",), ("score", "type")]
+
+
+async def test_not_cached_without_version(aggregations):
+    await job_service.get_job_breakdowns(None, ("type",))
+    await job_service.get_job_breakdowns(None, ("type",))
+    assert len(aggregations) == 2
+    assert await job_service.get_job_breakdowns(None, ()) == {}
+
+
+def test_parse_stats_dimensions():
+    assert job_service.parse_stats_dimensions(" weekly,type,weekly ") == ("type", "weekly")
+    assert job_service.parse_stats_dimensions(None) == ()
+    with pytest.raises(HTTPException) as excinfo:
+        job_service.parse_stats_dimensions("type,colour")
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,73 @@
+"""
+Micro-benchmark: decoding a jobs response into client-side models
+
+Compares the per-job decode time and retained memory of Job objects
+(Job.from_list), a JobBatch and the dictionaries AppState stores.
+
+Usage (from the project root):
+    python benchmarks/bench_models.py [count ...]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from job_organizer.models import Job, JobBatch
+
+
+def make_payload(count):
+    """Summary-view rows as the listing endpoint returns them"""
+    return [
+        {
+            "id": i,
+            "title": f"Backend Engineer {i}",
+            "company": f"Company {i % 500}",
+            "location": "Remote",
+            "status": "WISHLIST",
+            "type": "FULL_TIME",
+            "priority": ("HIGH", "MEDIUM", "LOW")[i % 3],
+            "date_added": "2025-01-01T00:00:00",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(decode, payload, repeat=3):
+    """Best decode time and the memory the result keeps alive"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        decode(payload)
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    result = decode(payload)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, retained
+
+
+CASES = {
+    "Job.from_list": Job.from_list,
+    "Job.from_list + to_dict": lambda payload: [job.to_dict() for job in Job.from_list(payload)],
+    "JobBatch.from_list": JobBatch.from_list,
+    "JobBatch.to_dicts": lambda payload: JobBatch.from_list(payload).to_dicts(),
+}
+
+
+def main(counts):
+    print(f"{'decoder':<26}{'jobs':>8}{'µs/job':>10}{'bytes/job':>12}")
+    for count in counts:
+        payload = make_payload(count)
+        for name, decode in CASES.items():
+            seconds, retained = measure(decode, payload)
+            print(f"{name:<26}{count:>8}{seconds / count * 1e6:>10.2f}{retained / count:>12.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
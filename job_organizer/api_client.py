@@ -2,41 +2,175 @@
 API Client for Job Organizer
 Handles all HTTP communication with the backend
 """
+import asyncio
 import httpx
+import importlib.util
+import json
 import logging
-from typing import List, Optional
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Set, Tuple
 from .config import config
-from .models import Job, Statistics
+from .models import Job, JobChanges, Statistics
+from .response_cache import CacheEntry, ResponseCache
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
+# Ask for the most compact body this process can decode. httpx already
+# advertises (and transparently decodes) gzip, plus brotli when installed.
+ACCEPT = "application/msgpack, application/json;q=0.9" if msgpack is not None else "application/json"
+
+# Responses worth retrying: the backend or its proxy was briefly unavailable
+RETRY_STATUS_CODES = {502, 503, 504}
+
+# Tells watchers that change events may have been lost and they should resync
+RESYNC = {"op": "resync"}
+
+
+class ApiError(Exception):
+    """The backend answered with an unexpected HTTP status"""
+    
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def decode_response(response: httpx.Response):
+    """Decode a JSON or MessagePack response body"""
+    if msgpack is not None and "msgpack" in response.headers.get("content-type", ""):
+        return msgpack.unpackb(response.content)
+    return response.json()
+
 
 class JobApiClient:
-    """Client for interacting with the Job Organizer API"""
+    """Client for interacting with the Job Organizer API
+    
+    All requests share one pooled ``httpx.AsyncClient``, so connections (and
+    TLS sessions) are kept alive between calls. The client is opened and
+    closed by the Reflex app's lifespan (see ``lifespan``), or opened lazily
+    on first use.
+    """
     
     def __init__(self):
         self.base_url = config.API_BASE_URL
         self.timeout = config.API_TIMEOUT
+        self.headers = {"Accept": ACCEPT}
+        self.retries = config.API_RETRIES
+        self.retry_backoff = config.API_RETRY_BACKOFF
+        self._client: Optional[httpx.AsyncClient] = None
+        self._watchers: Set[asyncio.Queue] = set()
+        self._feed_task: Optional[asyncio.Task] = None
+        self.cache = ResponseCache(
+            ttl=config.API_CACHE_TTL,
+            stale_ttl=config.API_CACHE_STALE_TTL,
+            max_entries=config.API_CACHE_MAX_ENTRIES,
+        )
         logger.info(f"JobApiClient initialized with base_url={self.base_url}")
     
+    def _create_client(self) -> httpx.AsyncClient:
+        http2 = config.API_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("API_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=self.timeout,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=config.API_MAX_CONNECTIONS,
+                max_keepalive_connections=config.API_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.API_KEEPALIVE_EXPIRY,
+            ),
+        )
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared HTTP client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+    
+    async def close(self):
+        """Close the shared HTTP client and its pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    @asynccontextmanager
+    async def lifespan(self):
+        """Reflex lifespan task: open the pool at startup, close it at shutdown"""
+        self.client
+        logger.info("JobApiClient connection pool opened")
+        try:
+            yield
+        finally:
+            await self.close()
+            logger.info("JobApiClient connection pool closed")
+    
+    async def _get(self, path: str, **kwargs) -> httpx.Response:
+        """GET with bounded retries and exponential backoff.
+        
+        GETs are idempotent, so transport errors and 502/503/504 responses
+        are retried up to ``API_RETRIES`` times; the last failure is raised
+        or returned as is.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.client.get(path, **kwargs)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.retries:
+                    return response
+                logger.warning(f"GET {path} returned HTTP {response.status_code}, retrying")
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"GET {path} failed ({e.__class__.__name__}), retrying")
+            # Full jitter keeps retrying clients from hitting the backend in step
+            await asyncio.sleep(random.uniform(0, self.retry_backoff * 2 ** attempt))
+    
+    async def _get_cached(self, path: str, params: Optional[dict] = None, decode=decode_response):
+        """``decode(response)`` of ``GET path``, served through the response cache
+        
+        Expired entries are revalidated with If-None-Match/If-Modified-Since,
+        so an unchanged resource costs the backend a 304 and no body.
+        """
+        params = params or {}
+        
+        async def load(entry: Optional[CacheEntry]) -> CacheEntry:
+            headers = {}
+            if entry is not None and entry.etag:
+                headers["If-None-Match"] = entry.etag
+            elif entry is not None and entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+            response = await self._get(path, params=params, headers=headers)
+            if response.status_code == 304 and entry is not None:
+                return CacheEntry(entry.data, entry.etag, entry.last_modified)
+            if response.status_code != 200:
+                raise ApiError(response.status_code)
+            return CacheEntry(
+                decode(response),
+                response.headers.get("etag"),
+                response.headers.get("last-modified"),
+            )
+        
+        return await self.cache.get((path, tuple(sorted(params.items()))), load)
+    
     async def fetch_statistics(self) -> Optional[Statistics]:
         """Fetch job statistics from the API"""
         logger.debug("Fetching statistics from API")
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/stats",
-                    timeout=self.timeout
-                )
-                
-                if response.status_code == 200:
-                    stats = Statistics.from_dict(response.json())
-                    logger.info(f"Successfully fetched statistics: {stats.total_jobs} jobs")
-                    return stats
-                else:
-                    logger.error(f"Failed to fetch stats: HTTP {response.status_code}")
-                    return None
-                    
+            stats = Statistics.from_dict(await self._get_cached("/stats"))
+            logger.info(f"Successfully fetched statistics: {stats.total_jobs} jobs")
+            return stats
+        
+        except ApiError as e:
+            logger.error(f"Failed to fetch stats: {e}")
+            return None
         except httpx.ConnectError as e:
             logger.error(f"Connection error: Backend not reachable at {self.base_url}")
             return None
@@ -44,68 +178,171 @@ class JobApiClient:
             logger.exception(f"Unexpected error fetching statistics: {e}")
             return None
     
-    async def fetch_jobs(
+    async def fetch_job_page(
         self,
         status: Optional[str] = None,
-        priority: Optional[str] = None
-    ) -> List[Job]:
+        priority: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Job], Optional[str], Optional[str]]:
         """
-        Fetch jobs from the API with optional filters
+        Fetch one page of jobs, following the backend's keyset cursors
         
         Args:
             status: Filter by job status
             priority: Filter by priority
-            
+            limit: Page size
+            cursor: ``next_cursor`` of the previous page, None for the first
+        
         Returns:
-            List of Job objects
+            The page's Job objects, the cursor of the next page (None on the
+            last page) and a change-feed watermark the page is at least as
+            new as (None on failure)
         """
-        logger.debug(f"Fetching jobs with filters: status={status}, priority={priority}")
+        logger.debug(f"Fetching job page: status={status}, priority={priority}, limit={limit}, cursor={cursor}")
         try:
-            # Build query parameters
-            params = {}
+            # Never cached and read on the primary: pages are synced from
+            # their watermark, so they must not be older than it
+            params = {"view": "summary", "limit": limit, "fresh": "true"}
             if status:
                 params["status"] = status
             if priority:
                 params["priority"] = priority
+            if cursor:
+                params["cursor"] = cursor
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/jobs",
-                    params=params,
-                    timeout=self.timeout
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    jobs = [Job.from_dict(item) for item in data]
-                    logger.info(f"Successfully fetched {len(jobs)} jobs")
-                    return jobs
-                else:
-                    logger.error(f"Failed to fetch jobs: HTTP {response.status_code}")
-                    return []
-                    
+            response = await self._get("/jobs", params=params)
+            if response.status_code != 200:
+                raise ApiError(response.status_code)
+            jobs = Job.from_list(decode_response(response))
+            logger.info(f"Successfully fetched a page of {len(jobs)} jobs")
+            return jobs, response.headers.get("x-next-cursor"), response.headers.get("x-changes-watermark")
+        
+        except ApiError as e:
+            logger.error(f"Failed to fetch jobs: {e}")
+            return [], None, None
         except httpx.ConnectError:
             logger.error(f"Connection error: Backend not reachable at {self.base_url}")
-            return []
+            return [], None, None
         except Exception as e:
             logger.exception(f"Unexpected error fetching jobs: {e}")
-            return []
+            return [], None, None
+    
+    async def fetch_job_changes(self, since: Optional[str] = None) -> Optional[JobChanges]:
+        """
+        Fetch jobs changed and ids removed since a watermark
+        
+        Args:
+            since: Watermark from the previous call; None returns only the
+                current watermark
+        
+        Returns:
+            JobChanges (summary fields plus date_added), or None on failure
+        """
+        logger.debug(f"Fetching job changes since {since}")
+        try:
+            # Never cached: every call must see the latest changes
+            params = {"view": "summary", "fields": "date_added"}
+            if since:
+                params["since"] = since
+            response = await self._get("/jobs/changes", params=params)
+            if response.status_code != 200:
+                raise ApiError(response.status_code)
+            changes = JobChanges.from_dict(decode_response(response))
+            logger.info(f"Fetched {len(changes.jobs)} changed and {len(changes.removed)} removed jobs")
+            return changes
+        
+        except ApiError as e:
+            logger.error(f"Failed to fetch job changes: {e}")
+            return None
+        except httpx.ConnectError:
+            logger.error(f"Connection error: Backend not reachable at {self.base_url}")
+            return None
+        except Exception as e:
+            logger.exception(f"Unexpected error fetching job changes: {e}")
+            return None
+    
+    async def watch_changes(self, idle_seconds: Optional[float] = None) -> AsyncIterator[List[dict]]:
+        """
+        Yield batches of live job change events from the backend
+        
+        All watchers in this process share one upstream event stream, so open
+        browser tabs do not each hold a backend connection. Events that
+        arrive while a watcher is busy are delivered together as one batch.
+        With idle_seconds, an empty batch is yielded after that long without
+        events, so the watcher can check whether it is still wanted.
+        """
+        queue = asyncio.Queue(maxsize=100)
+        self._watchers.add(queue)
+        if self._feed_task is None or self._feed_task.done():
+            self._feed_task = asyncio.create_task(self._run_change_feed())
+        try:
+            while True:
+                try:
+                    events = [await asyncio.wait_for(queue.get(), idle_seconds)]
+                except asyncio.TimeoutError:
+                    yield []
+                    continue
+                while not queue.empty():
+                    events.append(queue.get_nowait())
+                yield events
+        finally:
+            self._watchers.discard(queue)
+            if not self._watchers and self._feed_task is not None:
+                self._feed_task.cancel()
+                self._feed_task = None
+    
+    def _publish_change(self, event: dict):
+        for queue in self._watchers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+    
+    async def _run_change_feed(self):
+        """Follow GET /jobs/events, reconnecting with backoff"""
+        attempt = 0
+        while True:
+            try:
+                async with self.client.stream(
+                    "GET", "/jobs/events",
+                    headers={"Accept": "text/event-stream"},
+                    timeout=httpx.Timeout(self.timeout, read=None)
+                ) as response:
+                    if response.status_code != 200:
+                        raise ApiError(response.status_code)
+                    if attempt:
+                        # Whatever changed while disconnected was missed
+                        self._publish_change(RESYNC)
+                    attempt = 0
+                    data = []
+                    async for line in response.aiter_lines():
+                        if line.startswith("data:"):
+                            data.append(line[5:].strip())
+                        elif not line and data:
+                            self._publish_change(json.loads("\n".join(data)))
+                            data = []
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job change feed interrupted: {e!r}")
+            attempt += 1
+            await asyncio.sleep(min(30.0, self.retry_backoff * 2 ** attempt))
     
     async def health_check(self) -> bool:
         """Check if the API is reachable"""
         logger.debug("Performing health check")
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/stats",
-                    timeout=2.0
-                )
-                is_healthy = response.status_code == 200
-                if is_healthy:
-                    logger.info("Health check passed: API is reachable")
-                else:
-                    logger.warning(f"Health check failed: HTTP {response.status_code}")
-                return is_healthy
+            # A single attempt: the health check should report, not mask, failures
+            response = await self.client.get("/stats", timeout=2.0)
+            is_healthy = response.status_code == 200
+            if is_healthy:
+                logger.info("Health check passed: API is reachable")
+            else:
+                logger.warning(f"Health check failed: HTTP {response.status_code}")
+            return is_healthy
         except Exception as e:
             logger.error(f"Health check failed: {e}")
             return False
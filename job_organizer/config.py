@@ -26,6 +26,27 @@ class Config:
     # API Configuration
     API_BASE_URL: str = os.getenv("API_BASE_URL", "http://localhost:8000/api")
     API_TIMEOUT: float = float(os.getenv("API_TIMEOUT", "5.0"))
+    # Connection pool shared by all API calls
+    API_MAX_CONNECTIONS: int = int(os.getenv("API_MAX_CONNECTIONS", "20"))
+    API_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("API_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    API_KEEPALIVE_EXPIRY: float = float(os.getenv("API_KEEPALIVE_EXPIRY", "30.0"))
+    # HTTP/2 needs the optional 'h2' package
+    API_HTTP2: bool = os.getenv("API_HTTP2", "False").lower() == "true"
+    # Retries of idempotent (GET) calls, with exponential backoff from API_RETRY_BACKOFF seconds
+    API_RETRIES: int = int(os.getenv("API_RETRIES", "2"))
+    API_RETRY_BACKOFF: float = float(os.getenv("API_RETRY_BACKOFF", "0.2"))
+    # Response cache: served as is for API_CACHE_TTL seconds, then served stale
+    # while revalidating for up to API_CACHE_STALE_TTL more
+    API_CACHE_TTL: float = float(os.getenv("API_CACHE_TTL", "5.0"))
+    API_CACHE_STALE_TTL: float = float(os.getenv("API_CACHE_STALE_TTL", "60.0"))
+    API_CACHE_MAX_ENTRIES: int = int(os.getenv("API_CACHE_MAX_ENTRIES", "256"))
+    
+    # Job list paging: jobs fetched per "load more", and the most kept in
+    # state (and rendered) at once
+    JOBS_PAGE_SIZE: int = int(os.getenv("JOBS_PAGE_SIZE", "50"))
+    JOBS_WINDOW_SIZE: int = int(os.getenv("JOBS_WINDOW_SIZE", "200"))
+    # How often a quiet live-change watcher checks that its tab is still open
+    WATCH_IDLE_SECONDS: float = float(os.getenv("WATCH_IDLE_SECONDS", "30.0"))
     
     # Reflex Configuration
     REFLEX_FRONTEND_PORT: int = int(os.getenv("PORT", "3000"))
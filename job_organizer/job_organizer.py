@@ -3,6 +3,7 @@ Job Organizer - Reflex App (Refactored for Production)
 Clean architecture with separated concerns for Render deployment
 """
 import reflex as rx
+from .api_client import api_client
 from .config import setup_logging
 from .state import AppState
 from .pages import index
@@ -12,4 +13,7 @@ setup_logging()
 
 # Create the app
 app = rx.App()
-app.add_page(index, route="/", title="Job Organizer - Reflex")
+# Open the pooled API client at startup and close it on shutdown
+app.register_lifespan_task(api_client.lifespan)
+# Live updates start with the page; see AppState.watch_changes
+app.add_page(index, route="/", title="Job Organizer - Reflex", on_load=AppState.watch_changes)
@@ -1,8 +1,8 @@
 """
 Domain models for Job Organizer
 """
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import MISSING, dataclass, fields
+from typing import Dict, Iterable, List, Optional
 from enum import Enum
 
 
@@ -39,9 +39,13 @@ class Priority(str, Enum):
     LOW = "LOW"
 
 
-@dataclass
+@dataclass(slots=True)
 class Job:
-    """Job entity"""
+    """Job entity
+    
+    Slotted, so instances carry no per-instance __dict__. Build many at
+    once with from_list, or use JobBatch for very large lists.
+    """
     id: int
     title: str
     company: str
@@ -97,8 +101,59 @@ class Job:
     
     @classmethod
     def from_dict(cls, data: dict) -> "Job":
-        """Create Job from dictionary"""
-        return cls(**data)
+        """Create Job from dictionary, ignoring keys the model does not know"""
+        if data.keys() <= _JOB_FIELD_SET:
+            return cls(**data)
+        return cls(**{key: value for key, value in data.items() if key in _JOB_FIELD_SET})
+    
+    @classmethod
+    def from_list(cls, items: Iterable[dict]) -> List["Job"]:
+        """Create Jobs from an API response array"""
+        from_dict = cls.from_dict
+        return [from_dict(item) for item in items]
+
+
+JOB_FIELDS = tuple(field.name for field in fields(Job))
+_JOB_FIELD_SET = frozenset(JOB_FIELDS)
+_LIST_FIELDS = ("technologies", "requirements", "benefits", "responses")
+# List fields default to None here; rows are given fresh lists when built
+_JOB_DEFAULTS = {field.name: None if field.default is MISSING else field.default for field in fields(Job)}
+
+
+@dataclass(slots=True)
+class JobBatch:
+    """Many jobs stored column by column
+    
+    One list per field instead of one object per job: for large lists this
+    is the most compact form, and a column (e.g. every score) can be read
+    without touching the rest. Missing fields take the model defaults;
+    missing lists are kept as None until rows are built.
+    """
+    columns: Dict[str, list]
+    
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+    
+    def to_jobs(self) -> List[Job]:
+        """One Job per row"""
+        return [Job(*row) for row in zip(*(self.columns[name] for name in JOB_FIELDS))]
+    
+    def to_dicts(self) -> List[dict]:
+        """One dictionary per row, for Reflex state"""
+        columns = [
+            [[] if value is None else value for value in self.columns[name]] if name in _LIST_FIELDS else self.columns[name]
+            for name in JOB_FIELDS
+        ]
+        return [dict(zip(JOB_FIELDS, row)) for row in zip(*columns)]
+    
+    @classmethod
+    def from_list(cls, items: List[dict]) -> "JobBatch":
+        """Create JobBatch from an API response array"""
+        columns = {}
+        for name in JOB_FIELDS:
+            default = _JOB_DEFAULTS[name]
+            columns[name] = [item.get(name, default) for item in items]
+        return cls(columns=columns)
 
 
 @dataclass
@@ -116,3 +171,22 @@ class Statistics:
             status_counts=data.get("status_counts", {}),
             priority_counts=data.get("priority_counts", {}),
         )
+
+
+@dataclass
+class JobChanges:
+    """Jobs changed and removed since a watermark"""
+    jobs: List[Job]
+    removed: List[int]
+    watermark: str
+    has_more: bool = False
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "JobChanges":
+        """Create JobChanges from API response"""
+        return cls(
+            jobs=Job.from_list(data.get("jobs", [])),
+            removed=data.get("removed", []),
+            watermark=data["watermark"],
+            has_more=data.get("has_more", False),
+        )
@@ -57,11 +57,21 @@ def jobs_section() -> rx.Component:
             # Header with Load button
             rx.hstack(
                 rx.heading("Job List", size="6", color="gray.800"),
-                rx.button(
-                    "📋 Load All Jobs",
-                    on_click=[AppState.clear_filters, AppState.fetch_jobs],
-                    color_scheme="green",
-                    size="2",
+                rx.hstack(
+                    rx.button(
+                        "🔄 Sync Changes",
+                        on_click=AppState.sync_jobs,
+                        color_scheme="blue",
+                        variant="soft",
+                        size="2",
+                    ),
+                    rx.button(
+                        "📋 Load All Jobs",
+                        on_click=[AppState.clear_filters, AppState.fetch_jobs],
+                        color_scheme="green",
+                        size="2",
+                    ),
+                    spacing="2",
                 ),
                 justify="between",
                 width="100%",
@@ -117,15 +127,40 @@ def jobs_section() -> rx.Component:
                 rx.vstack(
                     rx.text(
                         "Showing ",
-                        rx.text(AppState.jobs.length(), as_="span", weight="bold", color="gray.800"),
-                        " jobs",
+                        rx.cond(
+                            AppState.jobs_skipped > 0,
+                            rx.text("jobs ", AppState.jobs_skipped + 1, "–", AppState.jobs_skipped + AppState.jobs.length(), as_="span", weight="bold", color="gray.800"),
+                            rx.text(AppState.jobs.length(), " jobs", as_="span", weight="bold", color="gray.800"),
+                        ),
                         size="2",
                         color="gray.600",
                     ),
+                    rx.cond(
+                        AppState.jobs_skipped > 0,
+                        rx.button(
+                            "⬆ Back to first jobs",
+                            on_click=AppState.fetch_jobs,
+                            color_scheme="gray",
+                            variant="soft",
+                            size="1",
+                        ),
+                    ),
                     rx.cond(
                         AppState.jobs.length() > 0,
                         rx.vstack(
                             rx.foreach(AppState.jobs, job_card),
+                            rx.cond(
+                                AppState.has_more_jobs,
+                                rx.button(
+                                    "⬇ Load more jobs",
+                                    on_click=AppState.load_more_jobs,
+                                    loading=AppState.loading_more_jobs,
+                                    color_scheme="green",
+                                    variant="soft",
+                                    size="2",
+                                    width="100%",
+                                ),
+                            ),
                             spacing="3",
                             width="100%",
                         ),
@@ -0,0 +1,91 @@
+"""
+Stale-while-revalidate cache for API responses
+Shared by all sessions of the Reflex app, so N dashboards polling the same
+data cost the backend one request
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """A decoded response body and the validators to revalidate it with"""
+    data: Any
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+# Loads a key: receives the current entry (None on a miss) and returns the
+# new entry; may return the same data with a fresh fetched_at after a 304
+Loader = Callable[[Optional[CacheEntry]], Awaitable[CacheEntry]]
+
+
+class ResponseCache:
+    """LRU-bounded cache with stale-while-revalidate semantics
+
+    - younger than ``ttl``: served from memory
+    - younger than ``ttl + stale_ttl``: served from memory immediately while
+      a background task revalidates it
+    - older, or missing: loaded before returning
+
+    Concurrent loads of the same key share one in-flight request.
+    """
+
+    def __init__(self, ttl: float = 5.0, stale_ttl: float = 60.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def get(self, key: Hashable, load: Loader) -> Any:
+        """Cached data for ``key``, loading or revalidating it as needed"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            age = time.monotonic() - entry.fetched_at
+            if age < self.ttl:
+                return entry.data
+            if age < self.ttl + self.stale_ttl:
+                self._refresh(key, load, entry)
+                return entry.data
+        # A cancelled caller must not cancel the load other callers share
+        return (await asyncio.shield(self._refresh(key, load, entry))).data
+
+    def clear(self):
+        """Drop all entries, e.g. after a write through this client"""
+        self._entries.clear()
+
+    def _refresh(self, key: Hashable, load: Loader, entry: Optional[CacheEntry]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, load, entry))
+            task.add_done_callback(self._log_background_failure)
+            self._inflight[key] = task
+        return task
+
+    async def _load(self, key: Hashable, load: Loader, entry: Optional[CacheEntry]) -> CacheEntry:
+        try:
+            entry = await load(entry)
+            entry.fetched_at = time.monotonic()
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _log_background_failure(task: asyncio.Task):
+        # Retrieving the exception keeps unawaited revalidations from warning;
+        # callers awaiting the task still get it raised
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Cache load failed: {task.exception()!r}")
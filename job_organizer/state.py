@@ -6,6 +6,7 @@ import reflex as rx
 import logging
 from typing import List, Dict, Any
 from .api_client import api_client
+from .config import config
 from .models import Job, Statistics
 
 logger = logging.getLogger(__name__)
@@ -19,9 +20,25 @@ class AppState(rx.State):
     status_counts: Dict[str, int] = {}
     priority_counts: Dict[str, int] = {}
     
-    # Job list
+    # Job list: a window of at most JOBS_WINDOW_SIZE jobs, filled a page at a
+    # time by following the backend's cursor
     jobs: List[Dict[str, Any]] = []
     jobs_loaded: bool = False
+    jobs_skipped: int = 0
+    has_more_jobs: bool = False
+    loading_more_jobs: bool = False
+    
+    # Paging position (backend only): the next page's cursor and the filters
+    # the loaded pages were fetched with
+    _next_cursor: str = ""
+    _loaded_status: str = ""
+    _loaded_priority: str = ""
+    # Position in the backend's change feed; sync_jobs merges what changed since
+    _watermark: str = ""
+    
+    # Live updates (backend only)
+    _stats_loaded: bool = False
+    _watching: bool = False
     
     # Filters
     filter_status: str = ""
@@ -34,13 +51,14 @@ class AppState(rx.State):
     async def fetch_stats(self):
         """Fetch statistics from API"""
         logger.info("Fetching statistics from backend")
-        
-        stats = await api_client.fetch_statistics()
-        
+        self._show_stats(await api_client.fetch_statistics())
+    
+    def _show_stats(self, stats):
         if stats:
             self.total_jobs = stats.total_jobs
             self.status_counts = stats.status_counts
             self.priority_counts = stats.priority_counts
+            self._stats_loaded = True
             self.api_status = "Connected ✅"
             self.api_error = ""
             logger.info(f"Statistics updated: {self.total_jobs} jobs, {len(self.status_counts)} statuses")
@@ -50,18 +68,176 @@ class AppState(rx.State):
             logger.error("Failed to fetch statistics from backend")
     
     async def fetch_jobs(self):
-        """Fetch jobs from API with current filters"""
+        """Fetch the first page of jobs with current filters"""
         logger.info(f"Fetching jobs with filters: status={self.filter_status}, priority={self.filter_priority}")
+        first_page = await _fetch_first_page(self.filter_status, self.filter_priority)
+        self._show_first_page(self.filter_status, self.filter_priority, *first_page)
+    
+    def _show_first_page(self, status: str, priority: str, watermark: str, page):
+        self._loaded_status = status
+        self._loaded_priority = priority
+        self.jobs = []
+        self.jobs_skipped = 0
+        self._watermark = watermark
+        self._add_page(*page)
+        self.jobs_loaded = True
+        logger.info(f"Jobs loaded successfully: {len(self.jobs)} jobs")
+    
+    async def load_more_jobs(self):
+        """Append the next page, dropping the oldest jobs beyond the window"""
+        if not self.has_more_jobs or self.loading_more_jobs:
+            return
+        self.loading_more_jobs = True
+        yield
+        try:
+            # Read no older than the watermark being synced from, so the
+            # change feed covers whatever changed since
+            jobs, next_cursor, _ = await _fetch_page(self._loaded_status, self._loaded_priority, self._next_cursor)
+            self._add_page(jobs, next_cursor)
+        finally:
+            self.loading_more_jobs = False
+    
+    def _add_page(self, jobs, next_cursor):
+        # Convert Job objects to dictionaries for Reflex state; only the
+        # window is kept, so state sync and the DOM stay bounded
+        loaded = self.jobs + [job.to_dict() for job in jobs]
+        overflow = max(0, len(loaded) - config.JOBS_WINDOW_SIZE)
+        self.jobs = loaded[overflow:]
+        self.jobs_skipped += overflow
+        self._next_cursor = next_cursor or ""
+        self.has_more_jobs = next_cursor is not None
+    
+    async def sync_jobs(self):
+        """Merge the jobs changed since the last load or sync into the list"""
+        if not self.jobs_loaded or not self._watermark:
+            await self.fetch_jobs()
+            return
+        logger.info("Syncing job changes")
+        batches = await _fetch_changes(self._watermark)
+        if batches is _RELOAD:
+            await self.fetch_jobs()
+        else:
+            self._apply_changes(batches)
+    
+    def _apply_changes(self, batches):
+        if batches is None:
+            self.api_error = "Could not sync job changes"
+            return
+        for changes in batches:
+            self._merge_changes(changes)
+            self._watermark = changes.watermark
+        logger.info(f"Synced {sum(len(c.jobs) + len(c.removed) for c in batches)} job changes")
+    
+    @rx.event(background=True)
+    async def watch_changes(self):
+        """Apply the backend's live job changes while the page is open
         
-        jobs = await api_client.fetch_jobs(
-            status=self.filter_status if self.filter_status else None,
-            priority=self.filter_priority if self.filter_priority else None
+        Count deltas are applied to the dashboard directly; the list is
+        patched with only what changed. The backend is called outside the
+        state lock, which is taken just to read positions and apply results,
+        and the task ends once the tab's socket has disconnected.
+        """
+        async with self:
+            if self._watching:
+                return
+            self._watching = True
+            token = self.router.session.client_token
+        logger.info("Watching live job changes")
+        try:
+            async for events in api_client.watch_changes(idle_seconds=config.WATCH_IDLE_SECONDS):
+                if not _client_connected(token):
+                    logger.info("Client disconnected, no longer watching job changes")
+                    break
+                if not events:
+                    continue
+                resync = any(event.get("op") == "resync" for event in events)
+                async with self:
+                    self._apply_count_deltas(events)
+                    refresh_stats = resync and self._stats_loaded
+                    jobs_loaded = self.jobs_loaded
+                    watermark = self._watermark
+                    filters = (self._loaded_status, self._loaded_priority)
+                
+                if resync:
+                    # Deltas were lost: cached responses may be stale too
+                    api_client.cache.clear()
+                if refresh_stats:
+                    stats = await api_client.fetch_statistics()
+                    async with self:
+                        self._show_stats(stats)
+                if not jobs_loaded:
+                    continue
+                batches = await _fetch_changes(watermark) if watermark else _RELOAD
+                if batches is _RELOAD:
+                    first_page = await _fetch_first_page(*filters)
+                async with self:
+                    # A load or sync that ran meanwhile left newer jobs
+                    if self._watermark != watermark or (self._loaded_status, self._loaded_priority) != filters:
+                        continue
+                    if batches is _RELOAD:
+                        self._show_first_page(*filters, *first_page)
+                    else:
+                        self._apply_changes(batches)
+        finally:
+            async with self:
+                self._watching = False
+    
+    def _apply_count_deltas(self, events: List[Dict[str, Any]]):
+        if not self._stats_loaded:
+            return
+        status_counts = dict(self.status_counts)
+        priority_counts = dict(self.priority_counts)
+        for event in events:
+            self.total_jobs += event.get("total") or 0
+            for counts, deltas in ((status_counts, event.get("status")), (priority_counts, event.get("priority"))):
+                for value, delta in (deltas or {}).items():
+                    counts[value] = counts.get(value, 0) + delta
+                    if counts[value] <= 0:
+                        del counts[value]
+        # Reassigned so Reflex sends the new dicts to the browser
+        self.status_counts = status_counts
+        self.priority_counts = priority_counts
+    
+    def _matches_filters(self, job: Dict[str, Any]) -> bool:
+        return (
+            (not self._loaded_status or job["status"] == self._loaded_status)
+            and (not self._loaded_priority or job["priority"] == self._loaded_priority)
         )
+    
+    def _merge_changes(self, changes):
+        removed = set(changes.removed)
+        changed = {job.id: job.to_dict() for job in changes.jobs}
         
-        # Convert Job objects to dictionaries for Reflex state
-        self.jobs = [job.to_dict() for job in jobs]
-        self.jobs_loaded = True
-        logger.info(f"Jobs loaded successfully: {len(self.jobs)} jobs")
+        merged = []
+        for job in self.jobs:
+            if job["id"] in removed:
+                continue
+            update = changed.pop(job["id"], None)
+            if update is None:
+                merged.append(job)
+            elif self._matches_filters(update):
+                merged.append(update)
+        
+        # Jobs entering the list are kept when they sort (newest first) into
+        # the loaded window; later pages will bring the others
+        def position(job):
+            # The backend's list order: date_added, then id, descending
+            return job["date_added"] or "", job["id"]
+        
+        newest = position(self.jobs[0]) if self.jobs and self.jobs_skipped else None
+        oldest = position(self.jobs[-1]) if self.jobs and self.has_more_jobs else None
+        for job in changed.values():
+            if (
+                self._matches_filters(job)
+                and (newest is None or position(job) <= newest)
+                and (oldest is None or position(job) >= oldest)
+            ):
+                merged.append(job)
+        merged.sort(key=position, reverse=True)
+        
+        overflow = max(0, len(merged) - config.JOBS_WINDOW_SIZE)
+        self.jobs = merged[overflow:]
+        self.jobs_skipped += overflow
     
     def set_status_filter(self, status: str):
         """Set status filter"""
@@ -78,3 +254,53 @@ class AppState(rx.State):
         logger.info("Clearing all filters")
         self.filter_status = ""
         self.filter_priority = ""
+
+
+# The backend calls behind the state's events, kept apart so the background
+# watcher can make them without holding the state lock
+
+# _fetch_changes result when reloading the list is cheaper than merging
+_RELOAD = "reload"
+
+
+def _client_connected(token: str) -> bool:
+    """Whether the browser tab with this client token still has its socket"""
+    from .job_organizer import app  # imports this module
+    namespace = app.event_namespace
+    return namespace is None or token in namespace.token_to_sid
+
+
+async def _fetch_page(status: str, priority: str, cursor: str = ""):
+    """A page of jobs, its next cursor and the watermark it was read at"""
+    return await api_client.fetch_job_page(
+        status=status if status else None,
+        priority=priority if priority else None,
+        limit=config.JOBS_PAGE_SIZE,
+        cursor=cursor if cursor else None
+    )
+
+
+async def _fetch_first_page(status: str, priority: str):
+    """The change-feed watermark and the first page of jobs"""
+    # Read together, so changes made after the page are synced later
+    jobs, next_cursor, watermark = await _fetch_page(status, priority)
+    return watermark or "", (jobs, next_cursor)
+
+
+async def _fetch_changes(watermark: str):
+    """Every batch of changes after the watermark; None if they could not be
+    fetched, or _RELOAD when there are more than the job window holds"""
+    batches = []
+    received = 0
+    while True:
+        changes = await api_client.fetch_job_changes(watermark)
+        if changes is None:
+            return None
+        received += len(changes.jobs) + len(changes.removed)
+        if received > config.JOBS_WINDOW_SIZE:
+            # More changes than jobs on screen: reloading is cheaper
+            return _RELOAD
+        batches.append(changes)
+        watermark = changes.watermark
+        if not changes.has_more:
+            return batches
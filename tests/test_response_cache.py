@@ -0,0 +1,112 @@
+"""Stale-while-revalidate behaviour of the shared API response cache"""
+import asyncio
+
+import pytest
+
+from job_organizer import response_cache
+from job_organizer.response_cache import CacheEntry, ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic time, in seconds"""
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+class Backend:
+    """A loader that returns versioned data and counts its calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = None
+
+    async def load(self, entry):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        return CacheEntry(data=f"v{self.calls}")
+
+
+async def settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+async def test_fresh_entry_served_from_memory(clock):
+    cache, backend = ResponseCache(ttl=5, stale_ttl=60), Backend()
+    assert await cache.get("stats", backend.load) == "v1"
+    clock[0] += 4
+    assert await cache.get("stats", backend.load) == "v1"
+    assert backend.calls == 1
+
+
+async def test_stale_entry_served_while_revalidating(clock):
+    cache, backend = ResponseCache(ttl=5, stale_ttl=60), Backend()
+    await cache.get("stats", backend.load)
+    clock[0] += 30
+    assert await cache.get("stats", backend.load) == "v1"
+    await settle()
+    assert backend.calls == 2
+    assert await cache.get("stats", backend.load) == "v2"
+
+
+async def test_expired_entry_loaded_before_returning(clock):
+    cache, backend = ResponseCache(ttl=5, stale_ttl=60), Backend()
+    await cache.get("stats", backend.load)
+    clock[0] += 66
+    assert await cache.get("stats", backend.load) == "v2"
+
+
+async def test_concurrent_misses_share_one_load(clock):
+    cache, backend = ResponseCache(), Backend()
+    backend.release = asyncio.Event()
+    waiting = [asyncio.ensure_future(cache.get("jobs", backend.load)) for _ in range(5)]
+    await settle()
+    backend.release.set()
+    assert await asyncio.gather(*waiting) == ["v1"] * 5
+    assert backend.calls == 1
+
+
+async def test_cancelled_caller_does_not_cancel_shared_load(clock):
+    cache, backend = ResponseCache(), Backend()
+    backend.release = asyncio.Event()
+    first = asyncio.ensure_future(cache.get("jobs", backend.load))
+    second = asyncio.ensure_future(cache.get("jobs", backend.load))
+    await settle()
+    first.cancel()
+    backend.release.set()
+    assert await second == "v1"
+    assert backend.calls == 1
+
+
+async def test_failed_load_is_not_cached(clock):
+    cache = ResponseCache()
+
+    async def failing(entry):
+        raise RuntimeError("backend down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get("stats", failing)
+    assert await cache.get("stats", Backend().load) == "v1"
+
+
+async def test_least_recently_used_entry_evicted(clock):
+    cache, backend = ResponseCache(max_entries=2), Backend()
+    await cache.get("a", backend.load)
+    await cache.get("b", backend.load)
+    await cache.get("a", backend.load)
+    await cache.get("c", backend.load)
+    assert backend.calls == 3
+    assert await cache.get("a", backend.load) == "v1"
+    assert await cache.get("b", backend.load) == "v4"
+
+
+async def test_clear(clock):
+    cache, backend = ResponseCache(), Backend()
+    await cache.get("stats", backend.load)
+    cache.clear()
+    assert await cache.get("stats", backend.load) == "v2"
@@ -0,0 +1,119 @@
+"""Windowing of the job list in AppState and merging changes into it"""
+import pytest
+
+pytest.importorskip("reflex")
+
+from job_organizer.config import config
+from job_organizer.models import Job, JobChanges
+from job_organizer.state import AppState
+
+
+WINDOW = 5
+
+
+@pytest.fixture
+def state(monkeypatch):
+    monkeypatch.setattr(config, "JOBS_WINDOW_SIZE", WINDOW)
+    # Reflex allows instantiating states directly under pytest
+    return AppState()
+
+
+def job(id, status="WISHLIST", priority="MEDIUM"):
+    # Newer ids were added later, as in the backend's list order
+    return Job(
+        id=id, title=f"Job {id}", company="Acme", location="Remote",
+        status=status, priority=priority, type="FULL_TIME",
+        date_added=f"2024-01-01T00:00:{id:02d}",
+    )
+
+
+def ids(state):
+    return [job["id"] for job in state.jobs]
+
+
+def test_pages_fill_the_window(state):
+    state._show_first_page("", "", "w1", ([job(9), job(8), job(7)], "c1"))
+    assert ids(state) == [9, 8, 7]
+    assert state.jobs_skipped == 0
+    assert state.has_more_jobs
+    assert state._next_cursor == "c1"
+
+
+def test_pages_beyond_the_window_drop_the_oldest_loaded(state):
+    state._show_first_page("", "", "w1", ([job(9), job(8), job(7)], "c1"))
+    state._add_page([job(6), job(5), job(4)], "c2")
+    assert ids(state) == [8, 7, 6, 5, 4]
+    assert state.jobs_skipped == 1
+
+    state._add_page([job(3), job(2)], None)
+    assert ids(state) == [6, 5, 4, 3, 2]
+    assert state.jobs_skipped == 3
+    assert not state.has_more_jobs
+    assert state._next_cursor == ""
+
+
+def test_first_page_resets_the_window(state):
+    state._show_first_page("", "", "w1", ([job(9), job(8), job(7)], "c1"))
+    state._add_page([job(6), job(5), job(4)], "c2")
+    state._show_first_page("APPLIED", "", "w2", ([job(3, status="APPLIED")], None))
+    assert ids(state) == [3]
+    assert state.jobs_skipped == 0
+    assert state._watermark == "w2"
+    assert state._loaded_status == "APPLIED"
+
+
+def changes(jobs=(), removed=(), watermark="w2"):
+    return JobChanges(jobs=list(jobs), removed=list(removed), watermark=watermark)
+
+
+def test_changes_update_and_remove_loaded_jobs(state):
+    state._show_first_page("", "", "w1", ([job(9), job(8), job(7)], None))
+    renamed = job(8)
+    renamed.title = "Renamed"
+    state._merge_changes(changes([renamed], removed=[7]))
+    assert ids(state) == [9, 8]
+    assert state.jobs[1]["title"] == "Renamed"
+
+
+def test_changed_jobs_are_rechecked_against_the_filters(state):
+    state._show_first_page("APPLIED", "", "w1", ([job(9, status="APPLIED"), job(8, status="APPLIED")], None))
+    state._merge_changes(changes([job(9, status="REJECTED"), job(10, status="WISHLIST"), job(7, status="APPLIED")]))
+    assert ids(state) == [8, 7]
+
+
+def test_new_jobs_are_placed_in_list_order(state):
+    state._show_first_page("", "", "w1", ([job(9), job(6)], None))
+    state._merge_changes(changes([job(7), job(10)]))
+    assert ids(state) == [10, 9, 7, 6]
+
+
+def test_new_jobs_outside_the_loaded_range_are_left_to_paging(state):
+    state._show_first_page("", "", "w1", ([job(9), job(8), job(7)], "c1"))
+    state._add_page([job(6), job(5), job(4)], "c2")
+    assert ids(state) == [8, 7, 6, 5, 4]
+    # Newer than the first loaded job: it would sort into the skipped jobs.
+    # Older than the last: the next page brings it.
+    state._merge_changes(changes([job(10), job(3), job(1)], removed=[6]))
+    assert ids(state) == [8, 7, 5, 4]
+
+
+def test_merged_jobs_beyond_the_window_drop_the_newest(state):
+    state._show_first_page("", "", "w1", ([job(9), job(8), job(6), job(5)], None))
+    state._merge_changes(changes([job(7), job(4), job(3)]))
+    assert ids(state) == [7, 6, 5, 4, 3]
+    assert state.jobs_skipped == 2
+
+
+def test_applied_batches_advance_the_watermark(state):
+    state._show_first_page("", "", "w1", ([job(9), job(8)], None))
+    state._apply_changes([changes(removed=[9], watermark="w2"), changes([job(10)], watermark="w3")])
+    assert ids(state) == [10, 8]
+    assert state._watermark == "w3"
+
+
+def test_failed_sync_keeps_the_list_and_watermark(state):
+    state._show_first_page("", "", "w1", ([job(9), job(8)], None))
+    state._apply_changes(None)
+    assert ids(state) == [9, 8]
+    assert state._watermark == "w1"
+    assert state.api_error